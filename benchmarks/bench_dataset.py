@@ -0,0 +1,257 @@
+"""Benchmarks of dataset building and transformations on synthetic data.
+
+Each case runs at each scale in a fresh process, against an in-process fake S3
+bucket and an in-memory SQLite database. The time of the case and the peak
+memory allocated by the case, without its setup, are recorded, and can be
+compared to a previous run. Memory is traced with tracemalloc, which slows down
+the case, so the time is measured in a separate untraced run.
+
+Run with:
+    python benchmarks/bench_dataset.py --output results.json
+    python benchmarks/bench_dataset.py --scales 1000000 --compare results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000]
+
+
+class Case(NamedTuple):
+    setup: Callable[[int], Any]
+    run: Callable[[Any], Any]
+    max_scale: Optional[int] = None  # larger scales are skipped unless forced
+    scales: List[int] = DEFAULT_SCALES  # scales run when --scales isn't given
+
+
+def _setup_db_query(scale: int) -> Any:
+    from coco_dataset.dataset.db_queries import DbClient
+    from coco_dataset.dataset.db_queries.base_query_builder import BaseQuery
+    import synthetic
+
+    conn = synthetic.make_db_connection(synthetic.make_query_rows(scale))
+    return DbClient(db_conn=conn), BaseQuery(synthetic.QUERY)
+
+
+def _setup_build(scale: int) -> Any:
+    from coco_dataset.dataset.s3_path_parser import ImageS3PathParser
+    import synthetic
+
+    rows = synthetic.make_query_rows(scale)
+    parser = ImageS3PathParser(
+        frames=synthetic.frames(),
+        bucket_name=synthetic.BUCKET_NAME,
+        bucket_region=synthetic.BUCKET_REGION,
+        s3_resource=synthetic.make_s3_resource(rows),
+    )
+    return rows, parser
+
+
+def _run_build(state: Any) -> Any:
+    from coco_dataset.dataset.dataset_builder import DfToCocoBuilder
+
+    rows, parser = state
+    return DfToCocoBuilder("bench", rows, parser).build()
+
+
+def _setup_from_json(scale: int) -> str:
+    import synthetic
+
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(synthetic.make_dataset(scale).dict(), f)
+    return path
+
+
+def _run_from_json(path: str) -> Any:
+    from coco_dataset import CocoDataset
+
+    try:
+        return CocoDataset.from_json(path)
+    finally:
+        os.remove(path)
+
+
+def _setup_dataset(scale: int) -> Any:
+    import synthetic
+
+    return synthetic.make_dataset(scale)
+
+
+def _setup_filter(scale: int) -> Any:
+    import synthetic
+
+    dataset = synthetic.make_dataset(scale)
+    return dataset, synthetic.block_list(dataset)
+
+
+def _setup_merge_classes(scale: int) -> Any:
+    import synthetic
+
+    dataset = synthetic.make_dataset(scale)
+    mappings = {c.name: f"group_{c.id % 5}" for c in dataset.categories}
+    return dataset, mappings
+
+
+def _run_compute_stats(dataset: Any) -> Any:
+    from coco_dataset.dataset.coco_dataset import compute_stats
+
+    return compute_stats(dataset)
+
+
+CASES: Dict[str, Case] = {
+    "db_query": Case(_setup_db_query, lambda s: s[0].run(s[1])),
+    # Small steps, to check how the build time grows with the number of rows.
+    "build": Case(
+        _setup_build,
+        _run_build,
+        max_scale=10_000,
+        scales=[1_000, 2_000, 5_000, 10_000, 1_000_000],
+    ),
+    "from_json": Case(_setup_from_json, _run_from_json),
+    "dict": Case(_setup_dataset, lambda dataset: dataset.dict()),
+    "filter_dataset": Case(
+        _setup_filter, lambda s: s[0].filter_dataset(s[1]), max_scale=100_000
+    ),
+    "merge_classes": Case(_setup_merge_classes, lambda s: s[0].merge_classes(s[1])),
+    "train_test_split": Case(_setup_dataset, lambda d: d.train_test_split()),
+    "compute_stats": Case(_setup_dataset, _run_compute_stats),
+}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of the process, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, and in kilobytes on Linux.
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(name: str, scale: int) -> Dict[str, Any]:
+    """Run a case in the current process."""
+    case = CASES[name]
+    state = case.setup(scale)
+    setup_rss_mb = peak_rss_mb()
+    start = time.perf_counter()
+    case.run(state)
+    seconds = time.perf_counter() - start
+
+    # Setup again, as some cases consume their state.
+    state = case.setup(scale)
+    tracemalloc.start()
+    case.run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "case": name,
+        "scale": scale,
+        "seconds": seconds,
+        "peak_mb": peak / 1024**2,
+        "setup_peak_rss_mb": setup_rss_mb,
+    }
+
+
+def run_case_in_subprocess(name: str, scale: int) -> Dict[str, Any]:
+    """Run a case in a fresh process, so memory peaks don't leak across cases."""
+    process = subprocess.run(
+        [sys.executable, __file__, "--run-case", name, "--scales", str(scale)],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        error = process.stderr.strip().splitlines()[-1:]
+        return {"case": name, "scale": scale, "error": " ".join(error)}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def git_sha() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Print the time and memory ratios of each result to a baseline."""
+    with open(baseline_path, "r") as f:
+        baseline = {
+            (r["case"], r["scale"]): r
+            for r in json.load(f)["results"]
+            if "seconds" in r
+        }
+    print(f"\nCompared to {baseline_path}:")
+    for r in results:
+        previous = baseline.get((r["case"], r["scale"]))
+        if previous is None or "seconds" not in r:
+            continue
+        ratio = r["seconds"] / previous["seconds"]
+        line = f"{r['case']:18} {r['scale']:>9}  x{ratio:.2f} time"
+        if previous.get("peak_mb"):
+            line += f"  x{r['peak_mb'] / previous['peak_mb']:.2f} memory"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument(
+        "--scales", nargs="+", type=int, help="Scales of all the cases."
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Run the cases above their max scale."
+    )
+    parser.add_argument("--output", help="Write the results to a JSON file.")
+    parser.add_argument("--compare", help="Compare to a previous results file.")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    benchmarks = os.path.dirname(os.path.abspath(__file__))
+    # The fake S3 resource is shared with the local runs of the workflows.
+    sys.path[:0] = [benchmarks, os.path.join(os.path.dirname(benchmarks), "workflows")]
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.scales[0])))
+        return 0
+
+    results: List[Dict[str, Any]] = []
+    for name in args.cases:
+        for scale in args.scales or CASES[name].scales:
+            max_scale = CASES[name].max_scale
+            if max_scale is not None and scale > max_scale and not args.force:
+                result = {"case": name, "scale": scale, "skipped": "above max scale"}
+            else:
+                result = run_case_in_subprocess(name, scale)
+            results.append(result)
+
+            if "seconds" in result:
+                status = f"{result['seconds']:10.3f} s {result['peak_mb']:10.1f} MB"
+            else:
+                status = result.get("skipped") or f"error: {result['error']}"
+            print(f"{name:18} {scale:>9}  {status}", flush=True)
+
+    if args.output:
+        metadata = {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "git_sha": git_sha(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        }
+        with open(args.output, "w") as f:
+            json.dump({"metadata": metadata, "results": results}, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
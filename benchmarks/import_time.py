@@ -0,0 +1,87 @@
+"""Import time benchmark of coco_dataset.
+
+Each import statement runs in a fresh interpreter. The benchmark fails when a
+heavy dependency is loaded by the import, or when the import takes longer than
+its budget.
+
+Run with:
+    python benchmarks/import_time.py
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+HEAVY_MODULES = ["boto3", "dotenv", "loguru", "numpy", "pandas", "pymssql", "tqdm"]
+
+# Import statements mapped to their budget in seconds, about twice the import
+# time measured when the budgets were set.
+STATEMENTS: Dict[str, float] = {
+    "import coco_dataset": 0.01,
+    "from coco_dataset import CocoDataset": 0.2,
+    "from coco_dataset.dataset.coco_dataset import CocoDataset, CocoImage": 0.2,
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+exec({statement!r})
+seconds = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": seconds, "heavy": heavy}}))
+"""
+
+
+def measure(statement: str, repeat: int) -> Tuple[float, List[str]]:
+    """Best import time of a statement over `repeat` fresh interpreters."""
+    timings: List[float] = []
+    heavy: List[str] = []
+    for _ in range(repeat):
+        code = PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+        process = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+        if process.returncode != 0:
+            error = process.stderr.strip().splitlines()[-1]
+            raise ImportError(f"{statement!r} failed: {error}")
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        heavy = result["heavy"]
+    return min(timings), heavy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget-scale",
+        type=float,
+        default=1.0,
+        help="Scale the time budgets, e.g. on slow CI machines.",
+    )
+    args = parser.parse_args()
+
+    failures = 0
+    for statement, budget in STATEMENTS.items():
+        try:
+            seconds, heavy = measure(statement, args.repeat)
+        except ImportError as e:
+            failures += 1
+            print(f"FAIL {e}")
+            continue
+        budget *= args.budget_scale
+        ok = not heavy and seconds <= budget
+        failures += not ok
+        status = "ok" if ok else "FAIL"
+        print(
+            f"{status:4} {seconds * 1000:8.1f} ms / {budget * 1000:.0f} ms  {statement}"
+        )
+        if heavy:
+            print(f"     loaded heavy modules: {heavy}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
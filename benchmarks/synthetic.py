@@ -0,0 +1,105 @@
+"""Synthetic datasets and query rows, with in-process S3 and database stand-ins."""
+
+import random
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict, List
+
+import pandas as pd
+
+from coco_dataset.dataset.coco_dataset import (
+    CocoAnnotation,
+    CocoCategory,
+    CocoDataset,
+    CocoImage,
+    CocoInfo,
+)
+from fake_s3 import FakeS3Resource
+
+BUCKET_NAME = "bucket"
+BUCKET_REGION = "eu-west-2"
+CAMERAS = ["cam_0"]
+FRAMES_PER_CAMERA = 2
+TABLE_NAME = "Labels"
+QUERY = f"SELECT * FROM {TABLE_NAME}"
+START_DATE = date(2023, 1, 1)
+
+
+def make_dataset(
+    n_annotations: int,
+    n_categories: int = 20,
+    annotations_per_image: int = 2,
+    seed: int = 0,
+) -> CocoDataset:
+    """Dataset with `n_annotations` annotations of random categories."""
+    rng = random.Random(seed)
+    n_images = max(1, n_annotations // annotations_per_image)
+    images = [
+        CocoImage(
+            id=i,
+            file_name=f"folder_{i}__cam_0__0000.jpg",
+            coco_url=f"{BUCKET_NAME}/folder_{i}/cam_0/0000.JPG",
+            date_captured=str(START_DATE + timedelta(days=i % 365)),
+        )
+        for i in range(n_images)
+    ]
+    categories = [CocoCategory(id=i, name=f"class_{i}") for i in range(n_categories)]
+    annotations = [
+        CocoAnnotation(
+            id=i, image_id=i % n_images, category_id=rng.randrange(n_categories)
+        )
+        for i in range(n_annotations)
+    ]
+    info = CocoInfo(
+        description="synthetic", date_created=str(date.today()), version="1.0.0"
+    )
+    return CocoDataset(
+        annotations=annotations, categories=categories, images=images, info=info
+    )
+
+
+def make_query_rows(n_rows: int, n_categories: int = 20, seed: int = 0) -> pd.DataFrame:
+    """Rows as returned by the labels query, one capture folder per row."""
+    rng = random.Random(seed)
+    return pd.DataFrame(
+        {
+            "BucketRegion": [BUCKET_REGION] * n_rows,
+            "S3Bucket": [BUCKET_NAME] * n_rows,
+            "CaptureFolderId": [f"folder_{i}" for i in range(n_rows)],
+            "SpecificationClass": [
+                f"class_{rng.randrange(n_categories)}" for _ in range(n_rows)
+            ],
+            "CaptureDate": [
+                str(START_DATE + timedelta(days=i % 365)) for i in range(n_rows)
+            ],
+        }
+    )
+
+
+def make_s3_resource(rows: pd.DataFrame) -> FakeS3Resource:
+    """S3 bucket holding `FRAMES_PER_CAMERA` frames per camera of each row."""
+    s3 = FakeS3Resource()
+    bucket = s3.Bucket(BUCKET_NAME)
+    for folder in rows["CaptureFolderId"]:
+        for camera in CAMERAS:
+            for frame in range(FRAMES_PER_CAMERA):
+                bucket.put_object(Key=f"{folder}/{camera}/{frame:04d}.JPG")
+    return s3
+
+
+def make_db_connection(rows: pd.DataFrame) -> sqlite3.Connection:
+    """In-memory SQLite database holding the rows in `TABLE_NAME`."""
+    conn = sqlite3.connect(":memory:")
+    rows.to_sql(TABLE_NAME, conn, index=False)
+    return conn
+
+
+def frames() -> Dict[str, int]:
+    """Frame index to pick in each camera folder."""
+    return {camera: 0 for camera in CAMERAS}
+
+
+def block_list(dataset: CocoDataset, fraction: float = 0.01) -> List[str]:
+    """File names of a fraction of the images, to filter out."""
+    step = max(1, int(1 / fraction))
+    return [im.file_name for im in dataset.images[::step]]
@@ -20,3 +20,4 @@ docker build -t ${IMAGE_NAME} \
 docker push ${IMAGE_NAME}
 pyflyte register workflows/example.py --image ${IMAGE_NAME} --version ${VERSION}
 pyflyte register workflows/custom.py --image ${IMAGE_NAME} --version ${VERSION}
+pyflyte register workflows/build_dataset.py --image ${IMAGE_NAME} --version ${VERSION}
@@ -1,5 +1,12 @@
-from .dataset import CocoDataset
+from typing import TYPE_CHECKING
+
+from .utils.lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from .dataset import CocoDataset
 
 __all__ = [
     "CocoDataset",
 ]
+
+__getattr__ = lazy_getattr(__name__, {"CocoDataset": ".dataset"})
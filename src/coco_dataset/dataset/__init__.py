@@ -1,7 +1,14 @@
 """Dataset module to build and download a dataset."""
 
-from .coco_dataset import CocoDataset
+from typing import TYPE_CHECKING
+
+from ..utils.lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from .coco_dataset import CocoDataset
 
 __all__ = [
     "CocoDataset",
 ]
+
+__getattr__ = lazy_getattr(__name__, {"CocoDataset": ".coco_dataset"})
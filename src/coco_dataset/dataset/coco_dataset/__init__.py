@@ -1,13 +1,30 @@
 """Coco format dataset module."""
 
-from .annotation import CocoAnnotation
-from .category import CocoCategory
-from .dataset import CocoDataset
-from .image import CocoImage
-from .info import CocoInfo
-from .detection import CocoDetection
-from .license import CocoLicense
-from .download import CocoDownloader
+from typing import TYPE_CHECKING
+
+from ...utils.lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from .annotation import CocoAnnotation
+    from .category import CocoCategory
+    from .dataset import CocoDataset
+    from .image import CocoImage
+    from .info import CocoInfo
+    from .detection import CocoDetection
+    from .diff import CocoDelta, diff_datasets
+    from .evaluation import CocoEvaluator, EvaluationResult
+    from .license import CocoLicense
+    from .download import CocoDownloader
+    from .dedup import CocoDeduplicator, DedupReport
+    from .image_size import CocoImageSizeProber
+    from .shards import CocoShardReader, CocoShardWriter
+    from .stats import (
+        DatasetIntegrityError,
+        DatasetStats,
+        IntegrityReport,
+        compute_stats,
+        validate_dataset,
+    )
 
 __all__ = [
     "CocoAnnotation",
@@ -17,5 +34,47 @@ __all__ = [
     "CocoInfo",
     "CocoLicense",
     "CocoDetection",
+    "CocoDelta",
+    "diff_datasets",
+    "CocoEvaluator",
+    "EvaluationResult",
     "CocoDownloader",
+    "CocoDeduplicator",
+    "DedupReport",
+    "CocoImageSizeProber",
+    "CocoShardReader",
+    "CocoShardWriter",
+    "DatasetIntegrityError",
+    "DatasetStats",
+    "IntegrityReport",
+    "compute_stats",
+    "validate_dataset",
 ]
+
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "CocoAnnotation": ".annotation",
+        "CocoCategory": ".category",
+        "CocoDataset": ".dataset",
+        "CocoImage": ".image",
+        "CocoInfo": ".info",
+        "CocoLicense": ".license",
+        "CocoDetection": ".detection",
+        "CocoDelta": ".diff",
+        "diff_datasets": ".diff",
+        "CocoEvaluator": ".evaluation",
+        "EvaluationResult": ".evaluation",
+        "CocoDownloader": ".download",
+        "CocoDeduplicator": ".dedup",
+        "DedupReport": ".dedup",
+        "CocoImageSizeProber": ".image_size",
+        "CocoShardReader": ".shards",
+        "CocoShardWriter": ".shards",
+        "DatasetIntegrityError": ".stats",
+        "DatasetStats": ".stats",
+        "IntegrityReport": ".stats",
+        "compute_stats": ".stats",
+        "validate_dataset": ".stats",
+    },
+)
@@ -1,6 +1,6 @@
 from typing import Optional, Tuple
 
-from sclearn.utils import BaseModel
+from ...utils import BaseModel
 
 
 class CocoAnnotation(BaseModel):
@@ -4,7 +4,6 @@ import random
 
 from pydantic.dataclasses import dataclass
 from pydantic import ConfigDict, Extra, parse_file_as
-from loguru import logger
 
 from .annotation import CocoAnnotation
 from .category import CocoCategory
@@ -53,6 +52,8 @@ class CocoDataset:
 
     def filter_dataset(self, block_list: List[str]) -> CocoDataset:
         """Filter a coco dataset given a block list of outlier images."""
+        from loguru import logger
+
         annotations: List[CocoAnnotation] = []
         images: List[CocoImage] = []
         for ann in self.annotations:
@@ -109,6 +110,53 @@ class CocoDataset:
             licenses=self.licenses.copy() if self.licenses else None,
         )
 
+    @classmethod
+    def merge(
+        cls, datasets: List[CocoDataset], info: Optional[CocoInfo] = None
+    ) -> CocoDataset:
+        """Merge several coco datasets into one.
+
+        Images are matched by file name and categories by name, so an image or a
+        class found in several datasets is kept once. Ids are re-assigned
+        incrementally, in the order the datasets are given."""
+        if not datasets:
+            raise ValueError("No dataset to merge.")
+
+        images: Dict[str, CocoImage] = {}
+        categories: Dict[str, CocoCategory] = {}
+        annotations: List[CocoAnnotation] = []
+        for dataset in datasets:
+            image_ids: Dict[int, int] = {}
+            for im in dataset.images:
+                if im.file_name not in images:
+                    images[im.file_name] = im.copy(update={"id": len(images)})
+                image_ids[im.id] = images[im.file_name].id
+
+            category_ids: Dict[int, int] = {}
+            for cat in dataset.categories:
+                if cat.name not in categories:
+                    categories[cat.name] = cat.copy(update={"id": len(categories)})
+                category_ids[cat.id] = categories[cat.name].id
+
+            for ann in dataset.annotations:
+                new_ann = ann.copy(
+                    update={
+                        "id": len(annotations),
+                        "image_id": image_ids[ann.image_id],
+                        "category_id": category_ids[ann.category_id],
+                    }
+                )
+                annotations.append(new_ann)
+
+        first = datasets[0]
+        return CocoDataset(
+            annotations=annotations,
+            categories=list(categories.values()),
+            images=list(images.values()),
+            info=info if info else first.info.copy(),
+            licenses=first.licenses.copy() if first.licenses else None,
+        )
+
     def train_test_split(self, train_ratio=0.8) -> Tuple[CocoDataset, CocoDataset]:
         """Split a coco dataset into train and test sets.
 
@@ -0,0 +1,222 @@
+import hashlib
+import os
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from ...utils import BaseModel, Timer, count
+from .annotation import CocoAnnotation
+from .dataset import CocoDataset
+from .image import CocoImage
+
+HASH_METHODS = ("sha256", "dhash")
+
+
+class DedupReport(BaseModel):
+    """Report of the images and annotations removed by deduplication.
+
+    Attributes:
+        removed_images (Dict[str, str]): file name of each removed image, mapped
+            to the file name of the image kept in its place.
+        removed_annotations (List[int]): ids of the annotations removed, because
+            they duplicate an annotation of the kept image.
+    """
+
+    removed_images: Dict[str, str] = {}
+    removed_annotations: List[int] = []
+
+
+class CocoDeduplicator:
+    """Find and collapse duplicate images of a coco dataset.
+
+    Images are duplicates when their S3 objects share the same ETag and size, or,
+    when a hash method is given, when their local files share the same hash.
+    For each group of duplicates the image with the lowest id is kept, and the
+    annotations of the others are moved to it.
+    """
+
+    def __init__(
+        self,
+        dataset: CocoDataset,
+        s3_resource=None,
+        local_folder: Optional[str] = None,
+        hash_method: Optional[str] = None,
+        max_workers: int = 16,
+    ) -> None:
+        """
+        Args:
+            dataset (CocoDataset): dataset to deduplicate.
+            s3_resource: boto3 S3 resource used to list the ETag and size of images.
+            local_folder (Optional[str]): folder holding the images by file name.
+            hash_method (Optional[str]): hash of the local files, either "sha256"
+                for exact content, or "dhash" for a perceptual hash (needs Pillow).
+            max_workers (int): number of concurrent S3 listings or hashing processes.
+        """
+        if hash_method is not None and hash_method not in HASH_METHODS:
+            raise ValueError(f"hash_method must be one of {HASH_METHODS}")
+        if hash_method is not None and local_folder is None:
+            raise ValueError("local_folder is required to hash images.")
+        if s3_resource is None and hash_method is None:
+            raise ValueError("Either s3_resource or hash_method must be given.")
+        self.dataset = dataset
+        self.s3 = s3_resource
+        self.local_folder = local_folder
+        self.hash_method = hash_method
+        self.max_workers = max_workers
+
+    def find_duplicates(self) -> List[List[CocoImage]]:
+        """Find the groups of duplicate images, sorted by image id."""
+        images = list({im.id: im for im in self.dataset.images}.values())
+        parents = {im.id: im.id for im in images}
+
+        def find(image_id: int) -> int:
+            while parents[image_id] != image_id:
+                parents[image_id] = parents[parents[image_id]]
+                image_id = parents[image_id]
+            return image_id
+
+        signatures: List[Dict[int, Hashable]] = []
+        if self.s3 is not None:
+            signatures.append(self._s3_signatures(images))
+        if self.hash_method is not None:
+            signatures.append(self._hash_signatures(images))
+
+        for signature in signatures:
+            first_seen: Dict[Hashable, int] = {}
+            for image_id, value in signature.items():
+                if value in first_seen:
+                    a, b = find(first_seen[value]), find(image_id)
+                    parents[max(a, b)] = min(a, b)
+                else:
+                    first_seen[value] = image_id
+
+        groups: Dict[int, List[CocoImage]] = {}
+        for im in images:
+            groups.setdefault(find(im.id), []).append(im)
+        return [
+            sorted(group, key=lambda im: im.id)
+            for _, group in sorted(groups.items())
+            if len(group) > 1
+        ]
+
+    def deduplicate(self) -> Tuple[CocoDataset, DedupReport]:
+        """Collapse the duplicate images, and their annotations."""
+        report = DedupReport()
+        kept_ids: Dict[int, int] = {}
+        for group in self.find_duplicates():
+            kept = group[0]
+            for im in group[1:]:
+                kept_ids[im.id] = kept.id
+                report.removed_images[im.file_name] = kept.file_name
+                logger.info(f"Removing {im.file_name}, duplicate of {kept.file_name}.")
+
+        images: List[CocoImage] = [
+            im for im in self.dataset.images if im.id not in kept_ids
+        ]
+        annotations: List[CocoAnnotation] = []
+        merged_ids = set(kept_ids.values())
+        seen: Set[Tuple[int, int, Optional[Tuple[float, ...]]]] = set()
+        for ann in self.dataset.annotations:
+            if ann.image_id in kept_ids:
+                ann = ann.copy(update={"image_id": kept_ids[ann.image_id]})
+            if ann.image_id not in merged_ids:
+                annotations.append(ann)
+                continue
+            key = (ann.image_id, ann.category_id, ann.bbox)
+            if key in seen:
+                report.removed_annotations.append(ann.id)
+                continue
+            seen.add(key)
+            annotations.append(ann)
+
+        dataset = CocoDataset(
+            annotations=annotations,
+            categories=self.dataset.categories.copy(),
+            images=images,
+            info=self.dataset.info.copy(),
+            licenses=self.dataset.licenses.copy() if self.dataset.licenses else None,
+        )
+        return dataset, report
+
+    def _s3_signatures(self, images: List[CocoImage]) -> Dict[int, Hashable]:
+        """Get the (ETag, size) of the images, listing each capture folder once."""
+        ids_per_key: Dict[Tuple[str, str], List[int]] = {}
+        for im in images:
+            bucket_name, _, object_key = im.coco_url.partition("/")
+            ids_per_key.setdefault((bucket_name, object_key), []).append(im.id)
+        prefixes = {(bucket, key.split("/")[0] + "/") for bucket, key in ids_per_key}
+
+        def list_prefix(prefix: Tuple[str, str]) -> List[Tuple[str, str, str, int]]:
+            bucket_name, s3_prefix = prefix
+            with Timer("s3_list"):
+                iterator = self.s3.Bucket(bucket_name).objects.filter(Prefix=s3_prefix)
+                listing = [(bucket_name, o.key, o.e_tag, o.size) for o in iterator]
+            count("s3_list_calls")
+            count("s3_listed_objects", len(listing))
+            return listing
+
+        signatures: Dict[int, Hashable] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for listing in executor.map(list_prefix, sorted(prefixes)):
+                for bucket_name, key, e_tag, size in listing:
+                    for image_id in ids_per_key.get((bucket_name, key), []):
+                        signatures[image_id] = (e_tag, size)
+        return signatures
+
+    def _hash_signatures(self, images: List[CocoImage]) -> Dict[int, Hashable]:
+        """Hash the local files of the images, in parallel processes.
+
+        Images whose file can't be read are left out of the grouping."""
+        assert self.local_folder is not None
+        paths = [os.path.join(self.local_folder, im.file_name) for im in images]
+        hash_file = _dhash if self.hash_method == "dhash" else _sha256
+        signatures: Dict[int, Hashable] = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(partial(_safe_hash, hash_file), paths, chunksize=64)
+            for im, (h, error) in zip(images, results):
+                if error is not None:
+                    logger.warning(f"Could not hash {im.file_name}: {error}")
+                else:
+                    signatures[im.id] = h
+        return signatures
+
+
+def _safe_hash(
+    hash_file: Callable[[str], Hashable], path: str
+) -> Tuple[Optional[Hashable], Optional[str]]:
+    """Hash of a file, or the error raised reading it."""
+    try:
+        return hash_file(path), None
+    except ImportError:
+        raise
+    except Exception as e:
+        return None, str(e)
+
+
+def _sha256(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _dhash(path: str, hash_size: int = 8) -> int:
+    """Difference hash: compares adjacent pixels of a downscaled grey image."""
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise ImportError("Pillow is required for the 'dhash' hash method.") from e
+
+    with Image.open(path) as im:
+        im.draft("L", (4 * (hash_size + 1), 4 * hash_size))
+        pixels = list(im.convert("L").resize((hash_size + 1, hash_size)).getdata())
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
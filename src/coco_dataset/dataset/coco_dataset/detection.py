@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Optional, Tuple
 
-from sclearn.utils import BaseModel
+from ...utils import BaseModel
 
 
 class CocoDetection(BaseModel):
@@ -9,11 +9,11 @@ class CocoDetection(BaseModel):
     Attributes:
         image_id (int): The id of the image.
         category_id (int): The id of the category.
-        bbox (List[int]): The bounding box of the detection.
+        bbox (Tuple[float, float, float, float]): The bounding box of the detection.
         score (Optional[float]): The score of the detection.
     """
 
     image_id: int
     category_id: int
-    bbox: List[int]
+    bbox: Tuple[float, float, float, float]
     score: Optional[float] = None
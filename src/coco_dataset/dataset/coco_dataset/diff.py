@@ -0,0 +1,322 @@
+from collections import Counter
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...utils import BaseModel
+from .annotation import CocoAnnotation
+from .category import CocoCategory
+from .dataset import CocoDataset
+from .image import CocoImage
+from .info import CocoInfo
+from .license import CocoLicense
+
+# Content of an annotation, independent of the ids:
+# (category name, bbox, area, iscrowd, json segmentation).
+AnnotationKey = Tuple[str, Any, Optional[float], Optional[int], Optional[str]]
+
+
+class AnnotationRecord(BaseModel):
+    """Annotation referenced by the file name of its image and its category name.
+
+    Attributes:
+        file_name (str): The file name of the image of the annotation.
+        category (str): The name of the category of the annotation.
+        bbox (Optional[Tuple[float, float, float, float]]): The bounding box.
+        area (Optional[float]): The area of the annotation.
+        segmentation (Optional[list]): The segmentation mask.
+        iscrowd (Optional[int]): Whether the annotation is a crowd.
+    """
+
+    file_name: str
+    category: str
+    bbox: Optional[Tuple[float, float, float, float]] = None
+    area: Optional[float] = None
+    segmentation: Optional[list] = None
+    iscrowd: Optional[int] = None
+
+    def key(self) -> AnnotationKey:
+        return _key(self.category, self)
+
+
+class Relabel(BaseModel):
+    """Annotation whose category changed.
+
+    Attributes:
+        annotation (AnnotationRecord): The annotation, with its old category.
+        new_category (str): The name of its new category.
+    """
+
+    annotation: AnnotationRecord
+    new_category: str
+
+
+class CocoDelta(BaseModel):
+    """Changes between two versions of a coco dataset.
+
+    Images are referenced by file name, categories by name and annotations by
+    content, so the delta doesn't depend on the ids of either version.
+
+    Attributes:
+        added_categories (List[CocoCategory]): Categories of the new version only.
+        removed_categories (List[str]): Names of the categories of the old version only.
+        changed_categories (List[CocoCategory]): Categories with new fields.
+        added_images (List[CocoImage]): Images of the new version only.
+        removed_images (List[str]): File names of the images of the old version only.
+        changed_images (List[CocoImage]): Images with new fields, e.g. a new size.
+        added_annotations (List[AnnotationRecord]): Annotations of the new version
+            only, including those of the added images.
+        removed_annotations (List[AnnotationRecord]): Annotations of the old version
+            only, including those of the removed images.
+        relabelled_annotations (List[Relabel]): Annotations whose category changed.
+        info (Optional[CocoInfo]): Info of the new version, if it changed.
+        licenses (Optional[List[CocoLicense]]): Licenses of the new version, if
+            they changed. An empty list removes the licenses.
+    """
+
+    added_categories: List[CocoCategory] = []
+    removed_categories: List[str] = []
+    changed_categories: List[CocoCategory] = []
+    added_images: List[CocoImage] = []
+    removed_images: List[str] = []
+    changed_images: List[CocoImage] = []
+    added_annotations: List[AnnotationRecord] = []
+    removed_annotations: List[AnnotationRecord] = []
+    relabelled_annotations: List[Relabel] = []
+    info: Optional[CocoInfo] = None
+    licenses: Optional[List[CocoLicense]] = None
+
+    def is_empty(self) -> bool:
+        return (
+            not any(self.summary().values())
+            and self.info is None
+            and self.licenses is None
+        )
+
+    def summary(self) -> Dict[str, int]:
+        """Number of changes of each kind."""
+        return {
+            "added_categories": len(self.added_categories),
+            "removed_categories": len(self.removed_categories),
+            "changed_categories": len(self.changed_categories),
+            "added_images": len(self.added_images),
+            "removed_images": len(self.removed_images),
+            "changed_images": len(self.changed_images),
+            "added_annotations": len(self.added_annotations),
+            "removed_annotations": len(self.removed_annotations),
+            "relabelled_annotations": len(self.relabelled_annotations),
+        }
+
+    def apply(self, dataset: CocoDataset) -> CocoDataset:
+        """Patch the old version of a dataset into the new version.
+
+        Unchanged images, categories and annotations keep their ids, and new ones
+        get ids following the largest id of the dataset."""
+        categories = {cat.name: cat for cat in dataset.categories}
+        next_cat_id = 1 + max([c.id for c in dataset.categories], default=-1)
+        for name in self.removed_categories:
+            _pop(categories, name, "category")
+        for cat in self.changed_categories:
+            old = _pop(categories, cat.name, "category")
+            categories[cat.name] = cat.copy(update={"id": old.id})
+        for cat in self.added_categories:
+            categories[cat.name] = cat.copy(update={"id": next_cat_id})
+            next_cat_id += 1
+
+        images = {im.file_name: im for im in dataset.images}
+        next_im_id = 1 + max([im.id for im in dataset.images], default=-1)
+        for im in self.changed_images:
+            old_im = _pop(images, im.file_name, "image")
+            images[im.file_name] = im.copy(update={"id": old_im.id})
+        for im in self.added_images:
+            images[im.file_name] = im.copy(update={"id": next_im_id})
+            next_im_id += 1
+
+        old_categories = {cat.id: cat.name for cat in dataset.categories}
+        old_images = {im.id: im.file_name for im in dataset.images}
+        annotations: Dict[Tuple[str, AnnotationKey], List[CocoAnnotation]] = {}
+        for ann in dataset.annotations:
+            file_name = old_images[ann.image_id]
+            key = _key(old_categories[ann.category_id], ann)
+            annotations.setdefault((file_name, key), []).append(ann)
+
+        next_ann_id = 1 + max([a.id for a in dataset.annotations], default=-1)
+        # Annotations to create from a record, with the id of the old annotation.
+        changed: List[Tuple[Optional[CocoAnnotation], AnnotationRecord]] = []
+        for record in self.removed_annotations:
+            _pop_annotation(annotations, record)
+        for relabel in self.relabelled_annotations:
+            ann = _pop_annotation(annotations, relabel.annotation)
+            new = relabel.annotation.copy(update={"category": relabel.new_category})
+            changed.append((ann, new))
+        for record in self.added_annotations:
+            changed.append((None, record))
+
+        for name in self.removed_images:
+            _pop(images, name, "image")
+
+        new_annotations: List[CocoAnnotation] = []
+        for (file_name, key), anns in annotations.items():
+            for ann in anns:
+                new_annotations.append(
+                    ann.copy(
+                        update={
+                            "image_id": _get(images, file_name, "image").id,
+                            "category_id": _get(categories, key[0], "category").id,
+                        }
+                    )
+                )
+        for old_ann, record in changed:
+            ann_id = old_ann.id if old_ann is not None else next_ann_id
+            if old_ann is None:
+                next_ann_id += 1
+            new_annotations.append(
+                CocoAnnotation(
+                    id=ann_id,
+                    image_id=_get(images, record.file_name, "image").id,
+                    category_id=_get(categories, record.category, "category").id,
+                    bbox=record.bbox,
+                    area=record.area,
+                    segmentation=record.segmentation,
+                    iscrowd=record.iscrowd,
+                )
+            )
+        new_annotations.sort(key=lambda ann: ann.id)
+
+        return CocoDataset(
+            annotations=new_annotations,
+            categories=sorted(categories.values(), key=lambda c: c.id),
+            images=sorted(images.values(), key=lambda im: im.id),
+            info=self.info.copy() if self.info else dataset.info.copy(),
+            licenses=self._licenses(dataset),
+        )
+
+    def _licenses(self, dataset: CocoDataset) -> Optional[List[CocoLicense]]:
+        licenses = self.licenses if self.licenses is not None else dataset.licenses
+        return [lc.copy() for lc in licenses] if licenses else None
+
+
+def diff_datasets(old: CocoDataset, new: CocoDataset) -> CocoDelta:
+    """Compute the changes from an old to a new version of a dataset.
+
+    Images are matched by file name, categories by name, and the annotations of
+    each image by a hashed key of their content. This runs in linear time."""
+    delta = CocoDelta()
+
+    old_cats = {cat.name: cat for cat in old.categories}
+    new_cats = {cat.name: cat for cat in new.categories}
+    for name, cat in new_cats.items():
+        if name not in old_cats:
+            delta.added_categories.append(cat)
+        elif _fields(cat) != _fields(old_cats[name]):
+            delta.changed_categories.append(cat)
+    delta.removed_categories = [name for name in old_cats if name not in new_cats]
+
+    old_ims = {im.file_name: im for im in old.images}
+    new_ims = {im.file_name: im for im in new.images}
+    for name, im in new_ims.items():
+        if name not in old_ims:
+            delta.added_images.append(im)
+        elif _fields(im) != _fields(old_ims[name]):
+            delta.changed_images.append(im)
+    delta.removed_images = [name for name in old_ims if name not in new_ims]
+
+    old_anns = _annotation_counts(old)
+    new_anns = _annotation_counts(new)
+    # Images in dataset order, so the delta doesn't depend on the hash seed.
+    file_names = dict.fromkeys([*old_ims, *new_ims, *old_anns, *new_anns])
+    for file_name in file_names:
+        old_counts = old_anns.get(file_name, Counter())
+        new_counts = new_anns.get(file_name, Counter())
+        removed = old_counts - new_counts
+        added = new_counts - old_counts
+        if not removed and not added:
+            continue
+
+        # An annotation removed and added with only a new category is a relabel.
+        added_by_shape: Dict[Tuple[Any, ...], List[AnnotationKey]] = {}
+        for key, n in added.items():
+            added_by_shape.setdefault(key[1:], []).extend([key] * n)
+        for key, n in removed.items():
+            candidates = added_by_shape.get(key[1:], [])
+            for _ in range(n):
+                if candidates:
+                    new_key = candidates.pop()
+                    added[new_key] -= 1
+                    delta.relabelled_annotations.append(
+                        Relabel(
+                            annotation=_record(file_name, key),
+                            new_category=new_key[0],
+                        )
+                    )
+                else:
+                    delta.removed_annotations.append(_record(file_name, key))
+        for key, n in added.items():
+            delta.added_annotations.extend([_record(file_name, key)] * n)
+
+    if _fields(old.info) != _fields(new.info):
+        delta.info = new.info
+    if _licenses(old) != _licenses(new):
+        delta.licenses = new.licenses or []
+    return delta
+
+
+def _key(category: str, ann: Any) -> AnnotationKey:
+    bbox = tuple(ann.bbox) if ann.bbox is not None else None
+    segmentation = (
+        json.dumps(ann.segmentation) if ann.segmentation is not None else None
+    )
+    return (category, bbox, ann.area, ann.iscrowd, segmentation)
+
+
+def _record(file_name: str, key: AnnotationKey) -> AnnotationRecord:
+    category, bbox, area, iscrowd, segmentation = key
+    return AnnotationRecord(
+        file_name=file_name,
+        category=category,
+        bbox=bbox,
+        area=area,
+        iscrowd=iscrowd,
+        segmentation=json.loads(segmentation) if segmentation is not None else None,
+    )
+
+
+def _annotation_counts(dataset: CocoDataset) -> Dict[str, Counter]:
+    """Count the annotation keys of each image, by file name."""
+    images = {im.id: im.file_name for im in dataset.images}
+    categories = {cat.id: cat.name for cat in dataset.categories}
+    counts: Dict[str, Counter] = {}
+    for ann in dataset.annotations:
+        key = _key(categories[ann.category_id], ann)
+        counts.setdefault(images[ann.image_id], Counter())[key] += 1
+    return counts
+
+
+def _licenses(dataset: CocoDataset) -> List[Dict[str, Any]]:
+    return [lc.dict() for lc in dataset.licenses or []]
+
+
+def _fields(model: Any) -> Dict[str, Any]:
+    """Fields of a model, without its id."""
+    return model.dict(exclude={"id"})
+
+
+def _get(items: Dict[str, Any], name: str, kind: str) -> Any:
+    if name not in items:
+        raise ValueError(f"Delta doesn't apply: missing {kind} '{name}'.")
+    return items[name]
+
+
+def _pop(items: Dict[str, Any], name: str, kind: str) -> Any:
+    item = _get(items, name, kind)
+    del items[name]
+    return item
+
+
+def _pop_annotation(
+    annotations: Dict[Tuple[str, AnnotationKey], List[CocoAnnotation]],
+    record: AnnotationRecord,
+) -> CocoAnnotation:
+    anns = annotations.get((record.file_name, record.key()))
+    if not anns:
+        raise ValueError(f"Delta doesn't apply: missing annotation {record}.")
+    return anns.pop()
@@ -1,6 +1,11 @@
+from __future__ import annotations
 import os
-from tqdm import tqdm
-from sclearn.dataset.coco_dataset import CocoDataset
+from typing import TYPE_CHECKING
+
+from ...utils import Timer, count
+
+if TYPE_CHECKING:
+    from .dataset import CocoDataset
 
 
 class CocoDownloader:
@@ -9,11 +14,17 @@ class CocoDownloader:
         self.s3 = s3_resource
 
     def download(self, output_folder: str) -> None:
+        from tqdm import tqdm
+
         os.makedirs(output_folder, exist_ok=True)
-        for image in tqdm(self.dataset.images):
-            url_components = image.coco_url.split("/")
-            bucket_name = url_components[0]
-            object_key = "/".join(url_components[1:])
-            local_path = os.path.join(output_folder, image.file_name)
-            tqdm.write(f"Downloading {image.file_name}...")
-            self.s3.Object(bucket_name, object_key).download_file(local_path)
+        with Timer("download"):
+            for image in tqdm(self.dataset.images):
+                url_components = image.coco_url.split("/")
+                bucket_name = url_components[0]
+                object_key = "/".join(url_components[1:])
+                local_path = os.path.join(output_folder, image.file_name)
+                tqdm.write(f"Downloading {image.file_name}...")
+                with Timer("s3_get"):
+                    self.s3.Object(bucket_name, object_key).download_file(local_path)
+                count("s3_get_calls")
+                count("s3_get_bytes", os.path.getsize(local_path))
@@ -0,0 +1,291 @@
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ...utils import BaseModel
+from .dataset import CocoDataset
+from .detection import CocoDetection
+
+# Recall thresholds used to interpolate the precision/recall curve, as in COCO.
+RECALL_THRESHOLDS = np.linspace(0.0, 1.0, 101)
+NO_PREDICTION = "<none>"
+
+
+class ClassMetrics(BaseModel):
+    """Detection metrics of a category.
+
+    Attributes:
+        category_id (int): The id of the category.
+        name (str): The name of the category.
+        n_ground_truths (int): Number of ground truth boxes of the category.
+        n_detections (int): Number of detections of the category.
+        precision (float): Precision over all the detections of the category.
+        recall (float): Recall over all the detections of the category.
+        ap (Optional[float]): Average precision, None without ground truth boxes.
+    """
+
+    category_id: int
+    name: str
+    n_ground_truths: int
+    n_detections: int
+    precision: float
+    recall: float
+    ap: Optional[float] = None
+
+
+class EvaluationResult(BaseModel):
+    """Evaluation of detections against a ground truth dataset.
+
+    Attributes:
+        iou_threshold (float): IoU above which a detection matches a ground truth.
+        per_class (List[ClassMetrics]): Detection metrics of each category.
+        mean_ap (Optional[float]): Mean of the APs of the categories with boxes.
+        accuracy (float): Image level accuracy, the top scoring detection of an
+            image predicting the category of each of its annotations.
+        confusion_labels (List[str]): Names of the categories, and of the
+            `NO_PREDICTION` label for images without any detection.
+        confusion_matrix (List[List[int]]): Image level confusion matrix, with
+            ground truths as rows and predictions as columns.
+    """
+
+    iou_threshold: float
+    per_class: List[ClassMetrics]
+    mean_ap: Optional[float] = None
+    accuracy: float
+    confusion_labels: List[str]
+    confusion_matrix: List[List[int]]
+
+
+class CocoEvaluator:
+    """Evaluate detections against a ground truth coco dataset.
+
+    Detections are matched greedily, by decreasing score, to the unmatched ground
+    truth box of the same image and category with the highest IoU. Matching and
+    metrics are vectorized with numpy. Crowd annotations are not treated apart.
+
+    Use like:
+    >>> result = CocoEvaluator(dataset).evaluate(detections)
+    """
+
+    def __init__(self, dataset: CocoDataset, iou_threshold: float = 0.5) -> None:
+        self.dataset = dataset
+        self.iou_threshold = iou_threshold
+        self.categories = sorted(dataset.categories, key=lambda c: c.id)
+        self._cat_ids = np.array([c.id for c in self.categories], dtype=np.int64)
+
+        anns = dataset.annotations
+        self._ann_images = np.array([a.image_id for a in anns], dtype=np.int64)
+        self._ann_cats = self._category_index(
+            np.array([a.category_id for a in anns], dtype=np.int64)
+        )
+        boxed = [a for a in anns if a.bbox is not None]
+        self._gt_images = np.array([a.image_id for a in boxed], dtype=np.int64)
+        self._gt_cats = self._category_index(
+            np.array([a.category_id for a in boxed], dtype=np.int64)
+        )
+        self._gt_boxes = np.array([a.bbox for a in boxed], dtype=np.float64).reshape(
+            -1, 4
+        )
+
+    def evaluate(
+        self, detections: Union[Sequence[CocoDetection], np.ndarray]
+    ) -> EvaluationResult:
+        """Evaluate the detections.
+
+        Args:
+            detections: list of CocoDetection, or array of shape (N, 7) holding
+                image_id, category_id, x, y, width, height and score.
+        """
+        if not isinstance(detections, np.ndarray):
+            detections = detections_to_array(detections)
+        if detections.ndim != 2 or detections.shape[1] != 7:
+            raise ValueError(f"Expected an (N, 7) array, got {detections.shape}")
+
+        det_images = detections[:, 0].astype(np.int64)
+        det_cats = self._category_index(detections[:, 1].astype(np.int64))
+        det_boxes = detections[:, 2:6]
+        scores = detections[:, 6]
+
+        tp = self._match(det_images, det_cats, det_boxes, scores)
+        per_class = self._class_metrics(det_cats, scores, tp)
+        aps = [m.ap for m in per_class if m.ap is not None]
+        accuracy, confusion = self._classification(det_images, det_cats, scores)
+
+        return EvaluationResult(
+            iou_threshold=self.iou_threshold,
+            per_class=per_class,
+            mean_ap=float(np.mean(aps)) if aps else None,
+            accuracy=accuracy,
+            confusion_labels=[c.name for c in self.categories] + [NO_PREDICTION],
+            confusion_matrix=confusion.tolist(),
+        )
+
+    def _category_index(self, category_ids: np.ndarray) -> np.ndarray:
+        """Map category ids to their index in the sorted categories."""
+        index = np.searchsorted(self._cat_ids, category_ids)
+        clipped = np.minimum(index, len(self._cat_ids) - 1)
+        unknown = (index >= len(self._cat_ids)) | (
+            self._cat_ids[clipped] != category_ids
+        )
+        if unknown.any():
+            raise ValueError(
+                f"Unknown category ids: {np.unique(category_ids[unknown])}"
+            )
+        return index
+
+    def _match(
+        self,
+        det_images: np.ndarray,
+        det_cats: np.ndarray,
+        det_boxes: np.ndarray,
+        scores: np.ndarray,
+    ) -> np.ndarray:
+        """Flag the detections matching a ground truth box (true positives).
+
+        Ground truths and detections are grouped by (image, category). The k-th
+        detection of every group is matched at the same time, so the loop runs
+        over the number of detections per group, not over the groups."""
+        tp = np.zeros(len(det_images), dtype=bool)
+        if len(self._gt_images) == 0 or len(det_images) == 0:
+            return tp
+
+        n_cats = len(self._cat_ids)
+        gt_keys = self._gt_images * n_cats + self._gt_cats
+        det_keys = det_images * n_cats + det_cats
+
+        # Ground truths padded per group: (n_groups, max_gts_per_group, 4).
+        gt_order = np.argsort(gt_keys, kind="stable")
+        group_keys, group_starts, group_sizes = np.unique(
+            gt_keys[gt_order], return_index=True, return_counts=True
+        )
+        gt_groups = np.repeat(np.arange(len(group_keys)), group_sizes)
+        gt_ranks = np.arange(len(gt_order)) - np.repeat(group_starts, group_sizes)
+        gt_boxes = np.full((len(group_keys), group_sizes.max(), 4), np.nan)
+        gt_boxes[gt_groups, gt_ranks] = self._gt_boxes[gt_order]
+        available = np.zeros(gt_boxes.shape[:2], dtype=bool)
+        available[gt_groups, gt_ranks] = True
+
+        # Detections with ground truths, ranked by decreasing score in their group.
+        det_groups = np.searchsorted(group_keys, det_keys)
+        det_groups_clipped = np.minimum(det_groups, len(group_keys) - 1)
+        has_gt = group_keys[det_groups_clipped] == det_keys
+        candidates = np.flatnonzero(has_gt)
+        if len(candidates) == 0:
+            return tp
+        candidates = candidates[
+            np.lexsort((-scores[candidates], det_groups_clipped[candidates]))
+        ]
+        groups = det_groups_clipped[candidates]
+        _, starts, sizes = np.unique(groups, return_index=True, return_counts=True)
+        ranks = np.arange(len(candidates)) - np.repeat(starts, sizes)
+
+        by_rank = np.argsort(ranks, kind="stable")
+        rank_bounds = np.searchsorted(ranks[by_rank], np.arange(ranks.max() + 2))
+        for k in range(ranks.max() + 1):
+            step = by_rank[rank_bounds[k] : rank_bounds[k + 1]]
+            dets, step_groups = candidates[step], groups[step]
+            ious = box_iou(det_boxes[dets][:, None, :], gt_boxes[step_groups])
+            ious[~available[step_groups]] = -1.0
+            best = ious.argmax(axis=1)
+            matched = ious[np.arange(len(dets)), best] >= self.iou_threshold
+            available[step_groups[matched], best[matched]] = False
+            tp[dets[matched]] = True
+        return tp
+
+    def _class_metrics(
+        self, det_cats: np.ndarray, scores: np.ndarray, tp: np.ndarray
+    ) -> List[ClassMetrics]:
+        """Precision, recall and AP of each category."""
+        n_gts = np.bincount(self._gt_cats, minlength=len(self.categories))
+        order = np.lexsort((-scores, det_cats))
+        sorted_cats, sorted_tp = det_cats[order], tp[order]
+        bounds = np.searchsorted(sorted_cats, np.arange(len(self.categories) + 1))
+
+        metrics: List[ClassMetrics] = []
+        for index, category in enumerate(self.categories):
+            cat_tp = sorted_tp[bounds[index] : bounds[index + 1]]
+            n_gt = int(n_gts[index])
+            n_tp = int(cat_tp.sum())
+            metrics.append(
+                ClassMetrics(
+                    category_id=category.id,
+                    name=category.name,
+                    n_ground_truths=n_gt,
+                    n_detections=len(cat_tp),
+                    precision=n_tp / len(cat_tp) if len(cat_tp) else 0.0,
+                    recall=n_tp / n_gt if n_gt else 0.0,
+                    ap=average_precision(cat_tp, n_gt) if n_gt else None,
+                )
+            )
+        return metrics
+
+    def _classification(
+        self, det_images: np.ndarray, det_cats: np.ndarray, scores: np.ndarray
+    ) -> Tuple[float, np.ndarray]:
+        """Image level accuracy and confusion matrix, from the top detections."""
+        n_cats = len(self.categories)
+        order = np.lexsort((-scores, det_images))
+        top_images, first = np.unique(det_images[order], return_index=True)
+        top_cats = det_cats[order][first]
+
+        position = np.searchsorted(top_images, self._ann_images)
+        clipped = np.minimum(position, max(len(top_images) - 1, 0))
+        predicted = np.full(len(self._ann_images), n_cats, dtype=np.int64)
+        if len(top_images):
+            found = top_images[clipped] == self._ann_images
+            predicted[found] = top_cats[clipped[found]]
+
+        confusion = np.bincount(
+            self._ann_cats * (n_cats + 1) + predicted,
+            minlength=n_cats * (n_cats + 1),
+        ).reshape(n_cats, n_cats + 1)
+        accuracy = (
+            float(np.mean(predicted == self._ann_cats)) if len(predicted) else 0.0
+        )
+        return accuracy, confusion
+
+
+def box_iou(boxes: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """IoU of [x, y, width, height] boxes, broadcast over the leading dimensions."""
+    x1 = np.maximum(boxes[..., 0], others[..., 0])
+    y1 = np.maximum(boxes[..., 1], others[..., 1])
+    x2 = np.minimum(boxes[..., 0] + boxes[..., 2], others[..., 0] + others[..., 2])
+    y2 = np.minimum(boxes[..., 1] + boxes[..., 3], others[..., 1] + others[..., 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    union = boxes[..., 2] * boxes[..., 3] + others[..., 2] * others[..., 3]
+    union = union - intersection
+    with np.errstate(invalid="ignore", divide="ignore"):
+        iou = intersection / union
+    return np.nan_to_num(iou, nan=0.0)
+
+
+def average_precision(tp: np.ndarray, n_ground_truths: int) -> float:
+    """COCO style AP, from the true positive flags of detections sorted by score."""
+    if len(tp) == 0:
+        return 0.0
+    cum_tp = np.cumsum(tp)
+    recall = cum_tp / n_ground_truths
+    precision = cum_tp / np.arange(1, len(tp) + 1)
+    envelope = np.maximum.accumulate(precision[::-1])[::-1]
+    index = np.searchsorted(recall, RECALL_THRESHOLDS, side="left")
+    interpolated = np.where(
+        index < len(envelope), envelope[np.minimum(index, len(envelope) - 1)], 0.0
+    )
+    return float(interpolated.mean())
+
+
+def detections_to_array(detections: Sequence[CocoDetection]) -> np.ndarray:
+    """Stack detections in an (N, 7) array.
+
+    Columns are image_id, category_id, x, y, width, height and score. Detections
+    without score get a score of 1."""
+    rows = [
+        (
+            d.image_id,
+            d.category_id,
+            *d.bbox,
+            d.score if d.score is not None else 1.0,
+        )
+        for d in detections
+    ]
+    return np.array(rows, dtype=np.float64).reshape(-1, 7)
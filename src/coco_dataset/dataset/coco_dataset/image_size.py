@@ -0,0 +1,179 @@
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from ...utils import count
+from .dataset import CocoDataset
+from .image import CocoImage
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SOI = b"\xff\xd8"
+# Start Of Frame markers, holding the image size. 0xC4, 0xC8 and 0xCC are not SOF.
+JPEG_SOF_MARKERS = {0xC0 + i for i in range(16)} - {0xC4, 0xC8, 0xCC}
+# Markers without a length field.
+JPEG_STANDALONE_MARKERS = {0x01, 0xD8} | {0xD0 + i for i in range(8)}
+
+
+class CocoImageSizeProber:
+    """Fill the width and height of coco images from their file headers.
+
+    Only the first bytes of each image are read, with ranged GETs on S3 or from
+    local files, and the JPEG or PNG header is parsed for the image size. Images
+    are probed concurrently and the sizes are cached by key.
+    """
+
+    def __init__(
+        self,
+        s3_resource=None,
+        local_folder: Optional[str] = None,
+        max_workers: int = 16,
+        header_bytes: int = 16 * 1024,
+        max_header_bytes: int = 1024 * 1024,
+    ) -> None:
+        """
+        Args:
+            s3_resource: boto3 S3 resource used to read images from their coco_url.
+            local_folder (Optional[str]): folder holding the images by file name,
+                read instead of S3 when given.
+            max_workers (int): number of images probed concurrently.
+            header_bytes (int): number of bytes read first. This is doubled, up to
+                `max_header_bytes`, when the header is not complete.
+            max_header_bytes (int): maximum number of bytes read per image.
+        """
+        if s3_resource is None and local_folder is None:
+            raise ValueError("Either s3_resource or local_folder must be given.")
+        self.s3 = s3_resource
+        self.local_folder = local_folder
+        self.max_workers = max_workers
+        self.header_bytes = header_bytes
+        self.max_header_bytes = max_header_bytes
+        self._cache: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+
+    def fill(self, dataset: CocoDataset) -> CocoDataset:
+        """Return a copy of the dataset with the image sizes filled.
+
+        Images whose size is already known, or can't be read, are left as is."""
+        to_probe = {
+            self._key(im): im
+            for im in dataset.images
+            if im.width is None or im.height is None
+        }
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(self._safe_probe, to_probe.values()))
+
+        images: List[CocoImage] = []
+        for im in dataset.images:
+            size = self._cache.get(self._key(im))
+            if (im.width is None or im.height is None) and size is not None:
+                im = im.copy(update={"width": size[0], "height": size[1]})
+            images.append(im)
+
+        return CocoDataset(
+            annotations=dataset.annotations.copy(),
+            categories=dataset.categories.copy(),
+            images=images,
+            info=dataset.info.copy(),
+            licenses=dataset.licenses.copy() if dataset.licenses else None,
+        )
+
+    def probe(self, image: CocoImage) -> Optional[Tuple[int, int]]:
+        """Get the (width, height) of an image, reading only its header."""
+        key = self._key(image)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        size = None
+        n_bytes = self.header_bytes
+        while size is None:
+            data = self._read(image, n_bytes)
+            size = parse_image_size(data)
+            if len(data) < n_bytes or n_bytes >= self.max_header_bytes:
+                break
+            n_bytes = min(2 * n_bytes, self.max_header_bytes)
+
+        with self._lock:
+            self._cache[key] = size
+        return size
+
+    def _safe_probe(self, image: CocoImage) -> Optional[Tuple[int, int]]:
+        try:
+            return self.probe(image)
+        except Exception as e:
+            logger.warning(f"Could not read size of {image.file_name}: {e}")
+            return None
+
+    def _key(self, image: CocoImage) -> str:
+        if self.local_folder is not None:
+            return os.path.join(self.local_folder, image.file_name)
+        return image.coco_url
+
+    def _read(self, image: CocoImage, n_bytes: int) -> bytes:
+        """Read the first `n_bytes` of an image."""
+        if self.local_folder is not None:
+            with open(self._key(image), "rb") as f:
+                return f.read(n_bytes)
+
+        url_components = image.coco_url.split("/")
+        bucket_name = url_components[0]
+        object_key = "/".join(url_components[1:])
+        response = self.s3.Object(bucket_name, object_key).get(
+            Range=f"bytes=0-{n_bytes - 1}"
+        )
+        data = response["Body"].read()
+        count("s3_get_calls")
+        count("s3_get_bytes", len(data))
+        return data
+
+
+def parse_image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """Parse the (width, height) from the first bytes of a JPEG or PNG image.
+
+    Returns None when the header is not complete."""
+    if data.startswith(PNG_SIGNATURE):
+        return _parse_png_size(data)
+    if data.startswith(JPEG_SOI):
+        return _parse_jpeg_size(data)
+    raise ImageHeaderError("Unsupported image format, expected JPEG or PNG.")
+
+
+def _parse_png_size(data: bytes) -> Optional[Tuple[int, int]]:
+    # Signature (8 bytes), then the IHDR chunk: length (4), type (4), width, height.
+    if len(data) < 24:
+        return None
+    if data[12:16] != b"IHDR":
+        raise ImageHeaderError("PNG image without IHDR chunk.")
+    width, height = struct.unpack(">II", data[16:24])
+    return width, height
+
+
+def _parse_jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    i = len(JPEG_SOI)
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            raise ImageHeaderError(f"Invalid JPEG marker at byte {i}.")
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            i += 2
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            # length (2), precision (1), height (2), width (2)
+            if i + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[i + 5 : i + 9])
+            return width, height
+        (length,) = struct.unpack(">H", data[i + 2 : i + 4])
+        i += 2 + length
+    return None
+
+
+class ImageHeaderError(Exception):
+    """Error raised when an image header can't be parsed."""
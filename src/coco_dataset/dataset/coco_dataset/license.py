@@ -1,6 +1,6 @@
 from typing import Optional
 
-from sclearn.utils import BaseModel
+from ...utils import BaseModel
 
 
 class CocoLicense(BaseModel):
@@ -0,0 +1,140 @@
+import heapq
+import json
+import os
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .annotation import CocoAnnotation
+from .dataset import CocoDataset
+from .image import CocoImage
+
+MANIFEST_NAME = "manifest.json"
+
+
+class CocoShardWriter:
+    """Export a coco dataset as shards, for distributed training.
+
+    Each shard is a self-consistent coco dataset: it holds a subset of the images
+    with all their annotations, and the categories, info and licenses of the whole
+    dataset. Images are spread across shards to balance the number of annotations.
+    """
+
+    def __init__(self, dataset: CocoDataset, num_shards: int) -> None:
+        if num_shards < 1:
+            raise ValueError(f"num_shards must be positive, got {num_shards}")
+        self.dataset = dataset
+        self.num_shards = num_shards
+
+    def write(self, output_folder: str) -> str:
+        """Write the shards and their manifest.
+
+        Returns:
+            str: path of the manifest.
+        """
+        os.makedirs(output_folder, exist_ok=True)
+        shard_entries: List[Dict[str, Any]] = []
+        for index, shard in enumerate(self.split()):
+            file_name = f"shard-{index:05d}-of-{self.num_shards:05d}.json"
+            with open(os.path.join(output_folder, file_name), "w") as f:
+                json.dump(shard.dict(), f)
+            shard_entries.append(
+                {
+                    "file_name": file_name,
+                    "num_images": len(shard.images),
+                    "num_annotations": len(shard.annotations),
+                }
+            )
+
+        manifest = {
+            "num_shards": self.num_shards,
+            "num_images": sum(s["num_images"] for s in shard_entries),
+            "num_annotations": sum(s["num_annotations"] for s in shard_entries),
+            "categories": [c.dict(exclude_none=True) for c in self.dataset.categories],
+            "info": self.dataset.info.dict(exclude_none=True),
+            "shards": shard_entries,
+        }
+        manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest_path
+
+    def split(self) -> List[CocoDataset]:
+        """Split the dataset in shards balanced by annotation count.
+
+        Images are assigned greedily, largest first, to the least loaded shard."""
+        annotations_per_image: Dict[int, List[CocoAnnotation]] = {}
+        for ann in self.dataset.annotations:
+            annotations_per_image.setdefault(ann.image_id, []).append(ann)
+
+        images = {im.id: im for im in self.dataset.images}
+        image_ids = sorted(
+            images, key=lambda i: (-len(annotations_per_image.get(i, [])), i)
+        )
+
+        shard_images: List[List[CocoImage]] = [[] for _ in range(self.num_shards)]
+        shard_annotations: List[List[CocoAnnotation]] = [
+            [] for _ in range(self.num_shards)
+        ]
+        loads = [(0, index) for index in range(self.num_shards)]
+        for image_id in image_ids:
+            load, index = heapq.heappop(loads)
+            anns = annotations_per_image.get(image_id, [])
+            shard_images[index].append(images[image_id])
+            shard_annotations[index].extend(anns)
+            heapq.heappush(loads, (load + len(anns), index))
+
+        return [
+            CocoDataset(
+                images=sorted(ims, key=lambda im: im.id),
+                annotations=sorted(anns, key=lambda ann: ann.id),
+                categories=self.dataset.categories.copy(),
+                info=self.dataset.info.copy(),
+                licenses=self.dataset.licenses.copy()
+                if self.dataset.licenses
+                else None,
+            )
+            for ims, anns in zip(shard_images, shard_annotations)
+        ]
+
+
+class CocoShardReader:
+    """Read a sharded coco dataset lazily, one shard at a time.
+
+    Use like:
+    >>> reader = CocoShardReader("path/to/manifest.json")
+    >>> for shard in reader.shards(rank=0, world_size=2):
+    ...     pass
+    """
+
+    def __init__(self, manifest_path: str) -> None:
+        self.folder = os.path.dirname(manifest_path)
+        with open(manifest_path, "r") as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+
+    def __len__(self) -> int:
+        return self.manifest["num_shards"]
+
+    def load_shard(self, index: int) -> CocoDataset:
+        """Load a single shard."""
+        file_name = self.manifest["shards"][index]["file_name"]
+        return CocoDataset.from_json(os.path.join(self.folder, file_name))
+
+    def shards(self, rank: int = 0, world_size: int = 1) -> Iterator[CocoDataset]:
+        """Iterate over the shards assigned to a worker."""
+        if not 0 <= rank < world_size:
+            raise ValueError(f"rank must be in [0, {world_size}), got {rank}")
+        for index in range(rank, len(self), world_size):
+            yield self.load_shard(index)
+
+    def __iter__(self) -> Iterator[CocoDataset]:
+        return self.shards()
+
+    def iter_images(
+        self, rank: int = 0, world_size: int = 1
+    ) -> Iterator[Tuple[CocoImage, List[CocoAnnotation]]]:
+        """Iterate over the images of a worker, with their annotations."""
+        for shard in self.shards(rank, world_size):
+            annotations_per_image: Dict[int, List[CocoAnnotation]] = {}
+            for ann in shard.annotations:
+                annotations_per_image.setdefault(ann.image_id, []).append(ann)
+            for im in shard.images:
+                yield im, annotations_per_image.get(im.id, [])
@@ -0,0 +1,195 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from ...utils import BaseModel
+from .dataset import CocoDataset
+
+UNKNOWN_DATE = "unknown"
+
+
+class IntegrityReport(BaseModel):
+    """Referential integrity violations of a coco dataset.
+
+    Attributes:
+        duplicate_image_ids (List[int]): Image ids used by several images.
+        duplicate_annotation_ids (List[int]): Annotation ids used by several
+            annotations.
+        duplicate_category_ids (List[int]): Category ids used by several categories.
+        duplicate_category_names (List[str]): Names used by several categories.
+        duplicate_file_names (List[str]): File names used by images of different ids.
+        annotations_with_missing_image (List[int]): Ids of the annotations whose
+            image_id is not in the images.
+        annotations_with_missing_category (List[int]): Ids of the annotations whose
+            category_id is not in the categories.
+        images_without_annotations (List[int]): Ids of the images without any
+            annotation.
+    """
+
+    duplicate_image_ids: List[int] = []
+    duplicate_annotation_ids: List[int] = []
+    duplicate_category_ids: List[int] = []
+    duplicate_category_names: List[str] = []
+    duplicate_file_names: List[str] = []
+    annotations_with_missing_image: List[int] = []
+    annotations_with_missing_category: List[int] = []
+    images_without_annotations: List[int] = []
+
+    def is_valid(self) -> bool:
+        return not any(self.summary().values())
+
+    def summary(self) -> Dict[str, int]:
+        """Number of violations of each kind."""
+        return {name: len(values) for name, values in self.dict().items()}
+
+
+class DatasetStats(BaseModel):
+    """Statistics of a coco dataset.
+
+    Attributes:
+        n_images (int): Number of distinct image ids.
+        n_annotations (int): Number of annotations.
+        n_categories (int): Number of distinct category ids.
+        annotations_per_class (Dict[str, int]): Number of annotations per category.
+        images_per_class (Dict[str, int]): Number of images per category.
+        annotations_per_date (Dict[str, int]): Number of annotations per capture day.
+        images_per_date (Dict[str, int]): Number of images per capture day.
+        annotations_per_image (Dict[int, int]): Number of images, by their number
+            of annotations.
+        integrity (IntegrityReport): Referential integrity violations.
+    """
+
+    n_images: int
+    n_annotations: int
+    n_categories: int
+    annotations_per_class: Dict[str, int]
+    images_per_class: Dict[str, int]
+    annotations_per_date: Dict[str, int]
+    images_per_date: Dict[str, int]
+    annotations_per_image: Dict[int, int]
+    integrity: IntegrityReport
+
+
+def compute_stats(dataset: CocoDataset) -> DatasetStats:
+    """Compute the statistics and integrity violations of a dataset.
+
+    The records are read once into numpy arrays, and all the statistics are
+    computed from these arrays with sorting and counting, without Python loops
+    over the annotations."""
+    images, annotations, categories = (
+        dataset.images,
+        dataset.annotations,
+        dataset.categories,
+    )
+    image_ids = _int_array([im.id for im in images])
+    file_names = np.array([im.file_name for im in images], dtype=object)
+    dates = np.array([_day(im.date_captured) for im in images], dtype=object)
+    category_ids = _int_array([cat.id for cat in categories])
+    category_names = np.array([cat.name for cat in categories], dtype=object)
+    ann_ids = _int_array([ann.id for ann in annotations])
+    ann_images = _int_array([ann.image_id for ann in annotations])
+    ann_categories = _int_array([ann.category_id for ann in annotations])
+
+    # Distinct images and categories, keeping the first record of duplicate ids.
+    unique_images, first_image = np.unique(image_ids, return_index=True)
+    unique_categories, first_category = np.unique(category_ids, return_index=True)
+    names = category_names[first_category]
+
+    image_index, has_image = _lookup(unique_images, ann_images)
+    category_index, has_category = _lookup(unique_categories, ann_categories)
+    valid = has_image & has_category
+
+    counts_per_image = np.bincount(image_index[has_image], minlength=len(unique_images))
+    annotations_per_class = np.bincount(
+        category_index[has_category], minlength=len(unique_categories)
+    )
+    pairs = np.unique(
+        image_index[valid] * len(unique_categories) + category_index[valid]
+    )
+    images_per_class = np.bincount(
+        pairs % max(len(unique_categories), 1), minlength=len(unique_categories)
+    )
+
+    unique_dates, date_index = np.unique(
+        dates[first_image].astype(str), return_inverse=True
+    )
+    images_per_date = np.bincount(date_index, minlength=len(unique_dates))
+    annotations_per_date = np.bincount(
+        date_index[image_index[has_image]], minlength=len(unique_dates)
+    )
+    n_annotations, n_images = np.unique(counts_per_image, return_counts=True)
+
+    distinct_files = file_names[first_image].astype(str)
+    integrity = IntegrityReport(
+        duplicate_image_ids=_duplicates(image_ids).tolist(),
+        duplicate_annotation_ids=_duplicates(ann_ids).tolist(),
+        duplicate_category_ids=_duplicates(category_ids).tolist(),
+        duplicate_category_names=_duplicates(names.astype(str)).tolist(),
+        duplicate_file_names=_duplicates(distinct_files).tolist(),
+        annotations_with_missing_image=ann_ids[~has_image].tolist(),
+        annotations_with_missing_category=ann_ids[~has_category].tolist(),
+        images_without_annotations=unique_images[counts_per_image == 0].tolist(),
+    )
+
+    return DatasetStats(
+        n_images=len(unique_images),
+        n_annotations=len(annotations),
+        n_categories=len(unique_categories),
+        annotations_per_class=_by_name(names, annotations_per_class),
+        images_per_class=_by_name(names, images_per_class),
+        annotations_per_date=_by_name(unique_dates, annotations_per_date),
+        images_per_date=_by_name(unique_dates, images_per_date),
+        annotations_per_image=dict(zip(n_annotations.tolist(), n_images.tolist())),
+        integrity=integrity,
+    )
+
+
+def validate_dataset(dataset: CocoDataset) -> DatasetStats:
+    """Compute the statistics of a dataset, raising on integrity violations."""
+    stats = compute_stats(dataset)
+    if not stats.integrity.is_valid():
+        raise DatasetIntegrityError(stats.integrity)
+    return stats
+
+
+class DatasetIntegrityError(ValueError):
+    """Error raised when a dataset has referential integrity violations."""
+
+    def __init__(self, report: IntegrityReport) -> None:
+        self.report = report
+        violations = {k: v for k, v in report.summary().items() if v}
+        super().__init__(f"Dataset integrity violations: {violations}")
+
+
+def _int_array(values: Sequence[int]) -> np.ndarray:
+    return np.fromiter(values, dtype=np.int64, count=len(values))
+
+
+def _day(date_captured) -> str:
+    """Day of a capture date, e.g. '2023-10-01' of '2023-10-01 12:00:00'."""
+    return date_captured[:10] if date_captured else UNKNOWN_DATE
+
+
+def _lookup(sorted_ids: np.ndarray, ids: np.ndarray):
+    """Index of each id in the sorted ids, and whether it was found."""
+    index = np.searchsorted(sorted_ids, ids)
+    clipped = np.minimum(index, max(len(sorted_ids) - 1, 0))
+    found = (
+        sorted_ids[clipped] == ids
+        if len(sorted_ids)
+        else np.zeros(len(ids), dtype=bool)
+    )
+    return clipped, found
+
+
+def _duplicates(values: np.ndarray) -> np.ndarray:
+    unique, counts = np.unique(values, return_counts=True)
+    return unique[counts > 1]
+
+
+def _by_name(names: np.ndarray, counts: np.ndarray) -> Dict[str, int]:
+    """Counts by name, summing the counts of duplicate names."""
+    result: Dict[str, int] = {}
+    for name, n in zip(names.tolist(), counts.tolist()):
+        result[name] = result.get(name, 0) + n
+    return result
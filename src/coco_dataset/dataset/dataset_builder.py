@@ -1,10 +1,8 @@
 """Dataset builder class to query the database, and create a dataset."""
-from typing import List, Optional, Tuple
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from datetime import date
 
-import pandas as pd
-from tqdm import tqdm
-
 from .coco_dataset.dataset import CocoDataset
 from .coco_dataset.annotation import CocoAnnotation
 from .coco_dataset.category import CocoCategory
@@ -12,6 +10,10 @@ from .coco_dataset.image import CocoImage
 from .coco_dataset.info import CocoInfo
 
 from .s3_path_parser import ImageS3PathParser
+from ..utils import Timer, count
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class DfToCocoBuilder:
@@ -50,26 +52,36 @@ class DfToCocoBuilder:
 
     def build(self) -> CocoDataset:
         """Builds a Cocodataset."""
-        for i, row in tqdm(self.df.iterrows(), total=self.df.shape[0]):
-            for image_url in self.parser.get_image_url(row["CaptureFolderId"]):
-                file_name = self._get_filename(image_url)
-                cat_id = self.categories_builder.get_or_add_id(
-                    row["SpecificationClass"]
-                )
-                date_str = str(row["CaptureDate"])
-                img_id = self.images_builder.get_or_add_id(
-                    file_name, coco_url=image_url, date_captured=date_str
-                )
-                self.annotations_builder.get_or_add_id(
-                    image_id=img_id, category_id=cat_id
-                )
-
-        return CocoDataset(
-            images=self.images_builder.images,
-            categories=self.categories_builder.categories,
-            annotations=self.annotations_builder.annotations,
-            info=self.info,
-        )
+        from tqdm import tqdm
+
+        with Timer("build"):
+            for i, row in tqdm(self.df.iterrows(), total=self.df.shape[0]):
+                with Timer("resolve_images"):
+                    image_urls = self.parser.get_image_url(row["CaptureFolderId"])
+                with Timer("add_records"):
+                    for image_url in image_urls:
+                        file_name = self._get_filename(image_url)
+                        cat_id = self.categories_builder.get_or_add_id(
+                            row["SpecificationClass"]
+                        )
+                        date_str = str(row["CaptureDate"])
+                        img_id = self.images_builder.get_or_add_id(
+                            file_name, coco_url=image_url, date_captured=date_str
+                        )
+                        self.annotations_builder.get_or_add_id(
+                            image_id=img_id, category_id=cat_id
+                        )
+            count("build_rows", self.df.shape[0])
+            count("build_images", len(self.images_builder.images))
+            count("build_categories", len(self.categories_builder.categories))
+            count("build_annotations", len(self.annotations_builder.annotations))
+
+            return CocoDataset(
+                images=self.images_builder.images,
+                categories=self.categories_builder.categories,
+                annotations=self.annotations_builder.annotations,
+                info=self.info,
+            )
 
     def _get_filename(self, image_url: str) -> str:
         """Gets the filename from the image url.
@@ -1,5 +1,16 @@
-from .db_client import DbClient
+from typing import TYPE_CHECKING
+
+from ...utils.lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from .booth_names import BOOTH_NAMES
+    from .db_client import DbClient
 
 __all__ = [
+    "BOOTH_NAMES",
     "DbClient",
 ]
+
+__getattr__ = lazy_getattr(
+    __name__, {"BOOTH_NAMES": ".booth_names", "DbClient": ".db_client"}
+)
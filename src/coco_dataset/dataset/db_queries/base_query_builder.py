@@ -3,7 +3,7 @@ from abc import ABC, abstractmethod
 
 from pydantic import BaseModel
 
-from sclearn.dataset.db_queries import BOOTH_NAMES
+from .booth_names import BOOTH_NAMES
 
 
 class BaseQuery:
@@ -0,0 +1,5 @@
+"""Names of the capture booths labelled data is queried from."""
+
+# Free-form booth name, as stored in the labels database. The list of booths is
+# not maintained in this package, so booth names are not validated.
+BOOTH_NAMES = str
@@ -1,34 +1,72 @@
-from typing import Optional
+from __future__ import annotations
+from typing import TYPE_CHECKING, Iterator, Optional
+import time
 import warnings
 
 from loguru import logger
-import pandas as pd
-import pymssql
-from dotenv import load_dotenv
 
-from sclearn.utils import Timer
+from ...utils import Timer, count, record_span
 from .utils import get_db_conn_from_env
 from .base_query_builder import BaseQuery
 
+if TYPE_CHECKING:
+    import pandas as pd
+    import pymssql
+
 
 class DbClient:
     """Database client to run queries."""
 
     def __init__(self, db_conn: Optional[pymssql.Connection] = None) -> None:
+        from dotenv import load_dotenv
+
         load_dotenv()
         self._db_conn = db_conn if db_conn else get_db_conn_from_env()
 
     def run(self, query: BaseQuery) -> pd.DataFrame:
         """Run the query and return the dataframe."""
-        with Timer():
+        with Timer("db_query"):
             logger.info("Running SQL query...")
             df: pd.DataFrame = self._run_sql_query(query.statement)
+        count("db_rows", len(df))
         logger.info(f"{df.head()=}")
         if df.empty:
             raise EmptyQueryError(query.statement)
         return df
 
+    def run_chunks(self, query: BaseQuery, chunksize: int) -> Iterator[pd.DataFrame]:
+        """Run the query and stream the rows in dataframes of `chunksize` rows."""
+        import pandas as pd
+
+        logger.info("Running SQL query in chunks...")
+        # The query runs across the yields, so only its own time is recorded, as
+        # one db_query span when the chunks are exhausted or closed.
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="pandas only supports SQLAlchemy")
+            chunks = pd.read_sql_query(
+                sql=query.statement, con=self._db_conn, chunksize=chunksize
+            )
+        seconds = time.perf_counter() - start
+        n_rows = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                chunk = next(chunks, None)
+                seconds += time.perf_counter() - start
+                if chunk is None:
+                    break
+                n_rows += len(chunk)
+                count("db_rows", len(chunk))
+                yield chunk
+        finally:
+            record_span("db_query", seconds)
+        if n_rows == 0:
+            raise EmptyQueryError(query.statement)
+
     def _run_sql_query(self, query: str) -> pd.DataFrame:
+        import pandas as pd
+
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", message="pandas only supports SQLAlchemy")
             df = pd.read_sql_query(sql=query, con=self._db_conn)
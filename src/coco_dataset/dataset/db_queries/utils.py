@@ -1,8 +1,10 @@
+from __future__ import annotations
 import os
 from enum import Enum
-from typing import List
+from typing import TYPE_CHECKING, List
 
-import pymssql
+if TYPE_CHECKING:
+    import pymssql
 
 
 def parse_list_to_sql(list_of_values: List[str]) -> str:
@@ -35,6 +37,9 @@ def get_db_conn_from_env() -> pymssql.Connection:
         raise KeyError(f"Environment variables not set: {e}")
     except ValueError:
         raise ValueError("DBPort must be an integer")
+
+    import pymssql
+
     conn = pymssql.connect(
         server=SERVER, port=PORT, database=DBNAME, user=DBUSER, password=DBPASSWORD
     )
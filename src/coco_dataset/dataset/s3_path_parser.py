@@ -1,6 +1,6 @@
 from typing import List, Dict
 
-import boto3
+from ..utils import Timer, count
 
 
 class ImageS3PathParser:
@@ -9,11 +9,16 @@ class ImageS3PathParser:
         frames: Dict[str, int],
         bucket_name: str,
         bucket_region: str,
+        s3_resource=None,
     ) -> None:
         self.frames = frames
         self.bucket_name = bucket_name
         self.bucket_region = bucket_region
-        self._s3 = boto3.Session(region_name=bucket_region).resource("s3")
+        if s3_resource is None:
+            import boto3
+
+            s3_resource = boto3.Session(region_name=bucket_region).resource("s3")
+        self._s3 = s3_resource
         self._bucket = self._s3.Bucket(bucket_name)
 
     def get_image_url(
@@ -48,9 +53,13 @@ class ImageS3PathParser:
         return s3_keys
 
     def _list_files_in_bucket(self, s3_prefix: str) -> List[str]:
-        iterator = self._bucket.objects.filter(Prefix=s3_prefix)
+        with Timer("s3_list"):
+            iterator = self._bucket.objects.filter(Prefix=s3_prefix)
+            keys = [i.key for i in iterator]
+        count("s3_list_calls")
+        count("s3_listed_objects", len(keys))
 
-        return [i.key for i in iterator]
+        return keys
 
     def filter_thumbnails(self, files: List[str]) -> List[str]:
         """Filter thumbnails from files"""
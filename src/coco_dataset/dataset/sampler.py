@@ -0,0 +1,187 @@
+"""Streaming class-balanced sampling of query rows and datasets."""
+from __future__ import annotations
+import heapq
+import random
+from itertools import count
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from .coco_dataset.annotation import CocoAnnotation
+from .coco_dataset.dataset import CocoDataset
+from .coco_dataset.image import CocoImage
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+T = TypeVar("T")
+
+
+class ClassBalancedSampler(Generic[T]):
+    """Sample uniformly up to `n_samples_per_class` items of each class, in one pass.
+
+    This is a per-class reservoir: each item gets a random priority and the items
+    with the highest priorities are kept. The `accept` filter, e.g. resolving the
+    images on S3, is only called for items which would enter the reservoir, so
+    rejected items never take a slot and the caps are exact after filtering.
+    Memory is bounded by the caps.
+
+    Use like:
+    >>> sampler = ClassBalancedSampler(100, seed=0, accept=has_images)
+    >>> sampler.extend(rows, label=lambda row: row["SpecificationClass"])
+    >>> samples = sampler.samples()
+    """
+
+    def __init__(
+        self,
+        n_samples_per_class: int,
+        seed: Optional[int] = None,
+        accept: Optional[Callable[[T], bool]] = None,
+    ) -> None:
+        """
+        Args:
+            n_samples_per_class (int): maximum number of items kept per class.
+            seed (Optional[int]): seed of the sampling, for reproducible samples
+                over the same stream.
+            accept (Optional[Callable[[T], bool]]): filter of the items.
+        """
+        if n_samples_per_class < 1:
+            raise ValueError(
+                f"n_samples_per_class must be positive, got {n_samples_per_class}"
+            )
+        self.n_samples_per_class = n_samples_per_class
+        self.accept = accept
+        self.seen: Dict[str, int] = {}
+        # Only the items which would have entered the reservoir are filtered.
+        self.rejected: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._order = count()
+        # Min-heaps of (priority, stream position, item) per class.
+        self._reservoirs: Dict[str, List[Tuple[float, int, T]]] = {}
+
+    def add(self, item: T, label: str) -> None:
+        """Offer an item of a class to the sampler."""
+        self.seen[label] = self.seen.get(label, 0) + 1
+        priority = self._rng.random()
+        position = next(self._order)
+        reservoir = self._reservoirs.setdefault(label, [])
+        full = len(reservoir) >= self.n_samples_per_class
+        if full and priority <= reservoir[0][0]:
+            return
+        if self.accept is not None and not self.accept(item):
+            self.rejected[label] = self.rejected.get(label, 0) + 1
+            return
+        if full:
+            heapq.heapreplace(reservoir, (priority, position, item))
+        else:
+            heapq.heappush(reservoir, (priority, position, item))
+
+    def extend(self, items: Iterable[T], label: Callable[[T], str]) -> None:
+        """Offer items to the sampler, labelled by the `label` function."""
+        for item in items:
+            self.add(item, label(item))
+
+    def samples(self) -> Dict[str, List[T]]:
+        """Sampled items of each class, in stream order."""
+        return {
+            label: [item for _, _, item in sorted(reservoir, key=lambda e: e[1])]
+            for label, reservoir in self._reservoirs.items()
+        }
+
+    def items(self) -> List[T]:
+        """Sampled items of all classes, in stream order."""
+        entries = [e for reservoir in self._reservoirs.values() for e in reservoir]
+        return [item for _, _, item in sorted(entries, key=lambda e: e[1])]
+
+
+def sample_rows(
+    chunks: Iterable[pd.DataFrame],
+    n_samples_per_class: int,
+    label_column: str = "SpecificationClass",
+    mappings: Optional[Dict[str, str]] = None,
+    seed: Optional[int] = None,
+    accept: Optional[Callable[[dict], bool]] = None,
+) -> pd.DataFrame:
+    """Sample query rows, streamed in chunks, up to a number of rows per class.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): query rows, e.g. from `DbClient.run_chunks`.
+        n_samples_per_class (int): maximum number of rows kept per class.
+        label_column (str): column holding the class of the rows.
+        mappings (Optional[Dict[str, str]]): class merges applied before sampling,
+            as in `CocoDataset.merge_classes`. The label column is not changed.
+        seed (Optional[int]): seed of the sampling.
+        accept (Optional[Callable[[dict], bool]]): filter of the rows, as dicts.
+
+    Returns:
+        pd.DataFrame: sampled rows, in stream order.
+    """
+    import pandas as pd
+
+    sampler: ClassBalancedSampler[dict] = ClassBalancedSampler(
+        n_samples_per_class, seed=seed, accept=accept
+    )
+    columns = None
+    for chunk in chunks:
+        columns = chunk.columns
+        for row in chunk.to_dict("records"):
+            label = row[label_column]
+            sampler.add(row, mappings[label] if mappings else label)
+
+    return pd.DataFrame.from_records(sampler.items(), columns=columns)
+
+
+def sample_dataset(
+    dataset: CocoDataset,
+    n_samples_per_class: int,
+    seed: Optional[int] = None,
+    block_list: Optional[Iterable[str]] = None,
+    accept: Optional[Callable[[CocoAnnotation], bool]] = None,
+) -> CocoDataset:
+    """Sample the annotations of a dataset, up to a number per category.
+
+    Args:
+        dataset (CocoDataset): dataset to sample.
+        n_samples_per_class (int): maximum number of annotations kept per category.
+        seed (Optional[int]): seed of the sampling.
+        block_list (Optional[Iterable[str]]): file names of images to skip.
+        accept (Optional[Callable[[CocoAnnotation], bool]]): filter of annotations.
+
+    Returns:
+        CocoDataset: dataset of the sampled annotations and their images, keeping
+            the ids, categories, info and licenses of the original dataset.
+    """
+    images = {im.id: im for im in dataset.images}
+    categories = {cat.id: cat.name for cat in dataset.categories}
+    blocked = set(block_list) if block_list else set()
+
+    def keep(ann: CocoAnnotation) -> bool:
+        if images[ann.image_id].file_name in blocked:
+            return False
+        return accept(ann) if accept is not None else True
+
+    sampler: ClassBalancedSampler[CocoAnnotation] = ClassBalancedSampler(
+        n_samples_per_class, seed=seed, accept=keep
+    )
+    sampler.extend(dataset.annotations, label=lambda ann: categories[ann.category_id])
+
+    annotations = sorted(sampler.items(), key=lambda ann: ann.id)
+    image_ids = {ann.image_id for ann in annotations}
+    sampled_images: List[CocoImage] = [
+        im for im in images.values() if im.id in image_ids
+    ]
+    return CocoDataset(
+        annotations=annotations,
+        categories=dataset.categories.copy(),
+        images=sampled_images,
+        info=dataset.info.copy(),
+        licenses=dataset.licenses.copy() if dataset.licenses else None,
+    )
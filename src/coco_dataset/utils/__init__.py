@@ -1,12 +1,36 @@
 """Utils for coco_dataset."""
 
-from .base_model import BaseModel, PascalBaseModel
-from .timer import Timer
-from .url import urlify
+from typing import TYPE_CHECKING
+
+from .lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from .base_model import BaseModel, PascalBaseModel
+    from .timer import Profiler, Timer, count, profiler, record_span
+    from .url import urlify
 
 __all__ = [
     "BaseModel",
     "PascalBaseModel",
+    "Profiler",
     "Timer",
+    "count",
+    "lazy_getattr",
+    "profiler",
+    "record_span",
     "urlify",
 ]
+
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "BaseModel": ".base_model",
+        "PascalBaseModel": ".base_model",
+        "Profiler": ".timer",
+        "Timer": ".timer",
+        "count": ".timer",
+        "profiler": ".timer",
+        "record_span": ".timer",
+        "urlify": ".url",
+    },
+)
@@ -0,0 +1,24 @@
+import importlib
+import sys
+from typing import Any, Callable, Dict
+
+
+def lazy_getattr(package: str, imports: Dict[str, str]) -> Callable[[str], Any]:
+    """Build a module `__getattr__` importing attributes on first access.
+
+    Use in a package `__init__` like:
+    >>> __getattr__ = lazy_getattr(__name__, {"Timer": ".timer"})
+
+    Args:
+        package (str): name of the package, to resolve relative module names.
+        imports (Dict[str, str]): attribute names mapped to their defining module.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name not in imports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(imports[name], package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return __getattr__
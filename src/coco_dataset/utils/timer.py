@@ -1,10 +1,124 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import json
+import re
+import threading
 import time
+from typing import Any, Dict, Optional, Tuple
 
 from loguru import logger
 
 TODAY = datetime.today().strftime("%Y-%m-%d")
 
+# Names of the spans currently open, from the outermost one.
+_current_span: ContextVar[Tuple[str, ...]] = ContextVar("current_span", default=())
+
+
+@dataclass
+class SpanStats:
+    """Aggregated timings of a span."""
+
+    calls: int = 0
+    total_seconds: float = 0.0
+    min_seconds: float = float("inf")
+    max_seconds: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.calls += 1
+        self.total_seconds += seconds
+        self.min_seconds = min(self.min_seconds, seconds)
+        self.max_seconds = max(self.max_seconds, seconds)
+
+
+class Profiler(object):
+    """Registry of span timings and counters.
+
+    Spans are aggregated by path, the names of the nested spans joined with "/".
+    Use like:
+    >>> with Timer("build"):
+    ...     with Timer("s3_list"):
+    ...         count("s3_calls")
+    >>> profiler.write_prometheus("metrics.prom")
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.spans: Dict[str, SpanStats] = {}
+        self.counters: Dict[str, float] = {}
+
+    def record_span(self, path: str, seconds: float) -> None:
+        with self._lock:
+            self.spans.setdefault(path, SpanStats()).add(seconds)
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = {path: vars(stats).copy() for path, stats in self.spans.items()}
+            counters = dict(self.counters)
+        return {"spans": spans, "counters": counters}
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def to_prometheus(self, prefix: str = "coco_dataset") -> str:
+        """Export the spans and counters in the Prometheus text format."""
+        data = self.to_dict()
+        lines = []
+        span_metrics = {
+            "span_calls_total": ("counter", "Number of calls of the span.", "calls"),
+            "span_seconds_total": (
+                "counter",
+                "Total time spent in the span.",
+                "total_seconds",
+            ),
+            "span_max_seconds": ("gauge", "Longest call of the span.", "max_seconds"),
+        }
+        for metric, (kind, help_text, field) in span_metrics.items():
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for path, stats in sorted(data["spans"].items()):
+                label = path.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{prefix}_{metric}{{span="{label}"}} {stats[field]}')
+        for name, value in sorted(data["counters"].items()):
+            metric = f"{prefix}_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "coco_dataset") -> None:
+        with open(path, "w") as f:
+            f.write(self.to_prometheus(prefix))
+
+
+def _metric_name(name: str) -> str:
+    """Sanitize a counter name into a Prometheus metric name."""
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+profiler = Profiler()
+
+
+def count(name: str, value: float = 1) -> None:
+    """Increment a counter of the default profiler."""
+    profiler.count(name, value)
+
+
+def record_span(name: str, seconds: float) -> None:
+    """Record a span timed without a Timer, e.g. across the yields of a generator.
+
+    The span is nested in the named timers open when it is recorded."""
+    profiler.record_span("/".join(_current_span.get() + (name,)), seconds)
+
 
 class Timer(object):
     """Context manager to measure the time of execution.
@@ -12,13 +126,32 @@ class Timer(object):
     >>> with Timer():
     ...     pass
     <prints time for execution>
+
+    Named timers are recorded as spans in the profiler instead, nested in the
+    named timers they run in. They don't log, as they can run once per record.
     """
 
+    def __init__(
+        self, name: Optional[str] = None, profiler: Optional[Profiler] = None
+    ) -> None:
+        self.name = name
+        self.profiler = profiler
+
     def __enter__(self):
+        if self.name:
+            self._token = _current_span.set(_current_span.get() + (self.name,))
         self.start = time.perf_counter()
         return self
 
     def __exit__(self, type, value, traceback):
         self.end = time.perf_counter()
         self.duration = timedelta(seconds=self.end - self.start)
-        logger.debug(f"{self.duration=}")
+        if not self.name:
+            logger.debug(f"{self.duration=}")
+            return
+
+        path = "/".join(_current_span.get())
+        _current_span.reset(self._token)
+        (self.profiler if self.profiler else profiler).record_span(
+            path, self.end - self.start
+        )
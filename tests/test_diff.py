@@ -0,0 +1,172 @@
+import os
+import random
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+from coco_dataset.dataset.coco_dataset import (
+    CocoAnnotation,
+    CocoCategory,
+    CocoDataset,
+    CocoDelta,
+    CocoImage,
+    CocoInfo,
+    CocoLicense,
+    diff_datasets,
+)
+
+
+def make_dataset(annotations, licenses=None, info_version="1"):
+    """Dataset of annotations given as (file_name, category name, bbox)."""
+    file_names = list(dict.fromkeys(f for f, _, _ in annotations))
+    names = sorted({name for _, name, _ in annotations})
+    images = [
+        CocoImage(id=i, file_name=f, coco_url=f"bucket/{f}")
+        for i, f in enumerate(file_names)
+    ]
+    categories = [CocoCategory(id=i, name=name) for i, name in enumerate(names)]
+    return CocoDataset(
+        images=images,
+        annotations=[
+            CocoAnnotation(
+                id=i,
+                image_id=file_names.index(f),
+                category_id=names.index(name),
+                bbox=bbox,
+            )
+            for i, (f, name, bbox) in enumerate(annotations)
+        ],
+        categories=categories,
+        info=CocoInfo(
+            description="test", date_created="2023-10-01", version=info_version
+        ),
+        licenses=licenses,
+    )
+
+
+def content(dataset):
+    """Content of a dataset, independent of the ids."""
+    images = {im.id: im for im in dataset.images}
+    categories = {cat.id: cat.name for cat in dataset.categories}
+    annotations = Counter(
+        (images[a.image_id].file_name, categories[a.category_id], a.bbox)
+        for a in dataset.annotations
+    )
+    return {
+        "images": sorted(
+            tuple(sorted(im.dict(exclude={"id"}).items())) for im in dataset.images
+        ),
+        "categories": sorted(categories.values()),
+        "annotations": annotations,
+        "info": dataset.info.dict(),
+        "licenses": [lc.dict() for lc in dataset.licenses or []],
+    }
+
+
+def assert_round_trip(old, new):
+    delta = diff_datasets(old, new)
+    assert content(delta.apply(old)) == content(new)
+    # The delta survives serialization.
+    assert content(CocoDelta.parse_raw(delta.json()).apply(old)) == content(new)
+    return delta
+
+
+def test_identical_datasets_give_empty_delta():
+    dataset = make_dataset([("a.jpg", "car", (0, 0, 1, 1))])
+    delta = assert_round_trip(dataset, dataset)
+    assert delta.is_empty()
+
+
+def test_relabel():
+    old = make_dataset([("a.jpg", "car", (0, 0, 1, 1)), ("a.jpg", "van", (5, 5, 1, 1))])
+    new = make_dataset([("a.jpg", "van", (0, 0, 1, 1)), ("a.jpg", "van", (5, 5, 1, 1))])
+    delta = assert_round_trip(old, new)
+    assert delta.summary()["relabelled_annotations"] == 1
+    assert delta.relabelled_annotations[0].new_category == "van"
+    assert delta.removed_categories == ["car"]
+    assert not delta.added_annotations and not delta.removed_annotations
+
+
+def test_removed_and_added_images():
+    old = make_dataset([("a.jpg", "car", (0, 0, 1, 1)), ("b.jpg", "car", (1, 1, 1, 1))])
+    new = make_dataset([("a.jpg", "car", (0, 0, 1, 1)), ("c.jpg", "bus", (2, 2, 1, 1))])
+    delta = assert_round_trip(old, new)
+    assert delta.removed_images == ["b.jpg"]
+    assert [im.file_name for im in delta.added_images] == ["c.jpg"]
+    assert [c.name for c in delta.added_categories] == ["bus"]
+    assert len(delta.removed_annotations) == len(delta.added_annotations) == 1
+
+
+@pytest.mark.parametrize(
+    "old_licenses, new_licenses",
+    [
+        (None, [CocoLicense(id=0, name="cc")]),
+        ([CocoLicense(id=0, name="cc")], [CocoLicense(id=0, name="cc-by")]),
+        ([CocoLicense(id=0, name="cc")], None),
+    ],
+)
+def test_license_changes(old_licenses, new_licenses):
+    annotations = [("a.jpg", "car", (0, 0, 1, 1))]
+    old = make_dataset(annotations, licenses=old_licenses)
+    new = make_dataset(annotations, licenses=new_licenses, info_version="2")
+    delta = assert_round_trip(old, new)
+    assert delta.licenses == (new_licenses or [])
+    assert delta.info is not None
+
+
+def random_version(rng, file_names, names):
+    annotations = []
+    for f in rng.sample(file_names, rng.randint(1, len(file_names))):
+        for _ in range(rng.randint(0, 3)):
+            box = (rng.randint(0, 3), rng.randint(0, 3), 1, 1)
+            annotations.append((f, rng.choice(names), box))
+    return annotations or [(file_names[0], names[0], (0, 0, 1, 1))]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_random_round_trip(seed):
+    rng = random.Random(seed)
+    file_names = [f"{i}.jpg" for i in range(6)]
+    names = ["car", "van", "bus"]
+    licenses = [None, [CocoLicense(id=0, name="cc")]]
+    old = make_dataset(
+        random_version(rng, file_names, names), licenses=rng.choice(licenses)
+    )
+    new = make_dataset(
+        random_version(rng, file_names, names), licenses=rng.choice(licenses)
+    )
+    assert_round_trip(old, new)
+
+
+DETERMINISM_SCRIPT = """
+import random, sys
+sys.path.insert(0, {tests!r})
+from test_diff import make_dataset, random_version
+rng = random.Random(0)
+file_names = [f"{{i}}.jpg" for i in range(20)]
+old = make_dataset(random_version(rng, file_names, ["car", "van"]))
+new = make_dataset(random_version(rng, file_names, ["car", "van"]))
+from coco_dataset.dataset.coco_dataset import diff_datasets
+patched = diff_datasets(old, new).apply(old)
+print([(a.id, a.image_id, a.category_id) for a in patched.annotations])
+"""
+
+
+def test_delta_does_not_depend_on_hash_seed():
+    script = DETERMINISM_SCRIPT.format(tests=os.path.dirname(__file__))
+    outputs = set()
+    for seed in ["1", "2", "3"]:
+        env = dict(
+            os.environ, PYTHONHASHSEED=seed, PYTHONPATH=os.pathsep.join(sys.path)
+        )
+        process = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+        outputs.add(process.stdout)
+    assert len(outputs) == 1
@@ -0,0 +1,126 @@
+import random
+
+import numpy as np
+import pytest
+
+from coco_dataset.dataset.coco_dataset import (
+    CocoAnnotation,
+    CocoCategory,
+    CocoDataset,
+    CocoDetection,
+    CocoEvaluator,
+    CocoImage,
+    CocoInfo,
+)
+from coco_dataset.dataset.coco_dataset.evaluation import box_iou
+
+
+def make_dataset(boxes):
+    """Dataset of annotations given as (image_id, category_id, bbox)."""
+    image_ids = sorted({image_id for image_id, _, _ in boxes})
+    return CocoDataset(
+        images=[
+            CocoImage(id=i, file_name=f"{i}.jpg", coco_url=f"{i}.jpg")
+            for i in image_ids
+        ],
+        annotations=[
+            CocoAnnotation(id=i, image_id=image_id, category_id=cat, bbox=bbox)
+            for i, (image_id, cat, bbox) in enumerate(boxes)
+        ],
+        categories=[CocoCategory(id=0, name="a"), CocoCategory(id=1, name="b")],
+        info=CocoInfo(description="test", date_created="2023-10-01", version="1"),
+    )
+
+
+def test_evaluate_hand_computed():
+    dataset = make_dataset(
+        [
+            (0, 0, (0, 0, 10, 10)),
+            (0, 0, (20, 20, 10, 10)),
+            (1, 1, (0, 0, 10, 10)),
+            (2, 1, (0, 0, 10, 10)),
+        ]
+    )
+    detections = [
+        # Class a, sorted by score: FP, TP, FP (best box already taken), TP.
+        CocoDetection(image_id=1, category_id=0, bbox=(0, 0, 10, 10), score=0.95),
+        CocoDetection(image_id=0, category_id=0, bbox=(0, 0, 10, 10), score=0.9),
+        CocoDetection(image_id=0, category_id=0, bbox=(1, 0, 10, 10), score=0.8),
+        CocoDetection(image_id=0, category_id=0, bbox=(20, 20, 10, 10), score=0.7),
+        # Class b: TP at exactly the IoU threshold; image 2 has no detection.
+        CocoDetection(image_id=1, category_id=1, bbox=(0, 0, 10, 5), score=0.6),
+    ]
+
+    result = CocoEvaluator(dataset, iou_threshold=0.5).evaluate(detections)
+
+    a, b = result.per_class
+    assert (a.n_ground_truths, a.n_detections) == (2, 4)
+    assert (a.precision, a.recall) == (0.5, 1.0)
+    # The precision envelope is 0.5 at every recall.
+    assert a.ap == pytest.approx(0.5)
+    assert (b.n_ground_truths, b.n_detections) == (2, 1)
+    assert (b.precision, b.recall) == (1.0, 0.5)
+    # Precision 1 up to recall 0.5, so at 51 of the 101 recall thresholds.
+    assert b.ap == pytest.approx(51 / 101)
+    assert result.mean_ap == pytest.approx((0.5 + 51 / 101) / 2)
+
+    # The top detections of images 0 and 1 predict a, image 2 has none.
+    assert result.confusion_labels == ["a", "b", "<none>"]
+    assert result.confusion_matrix == [[2, 0, 0], [1, 0, 1]]
+    assert result.accuracy == 0.5
+
+
+def greedy_true_positives(dataset, detections, iou_threshold):
+    """Reference matching, one detection at a time by decreasing score."""
+    available = {ann.id: True for ann in dataset.annotations}
+    tp = np.zeros(len(detections), dtype=bool)
+    for i in sorted(range(len(detections)), key=lambda i: -detections[i, 6]):
+        image_id, cat, *box, _ = detections[i]
+        best, best_iou = None, -1.0
+        for ann in dataset.annotations:
+            if ann.image_id != image_id or ann.category_id != cat:
+                continue
+            iou = box_iou(np.array(box), np.array(ann.bbox))
+            if available[ann.id] and iou > best_iou:
+                best, best_iou = ann.id, iou
+        if best is not None and best_iou >= iou_threshold:
+            available[best] = False
+            tp[i] = True
+    return tp
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_match_agrees_with_greedy_reference(seed):
+    rng = random.Random(seed)
+
+    def box():
+        return (rng.randint(0, 20), rng.randint(0, 20), 10, 10)
+
+    dataset = make_dataset(
+        [(rng.randrange(5), rng.randrange(2), box()) for _ in range(40)]
+    )
+    detections = np.array(
+        [(rng.randrange(5), rng.randrange(2), *box(), rng.random()) for _ in range(80)],
+        dtype=np.float64,
+    )
+
+    evaluator = CocoEvaluator(dataset, iou_threshold=0.3)
+    tp = evaluator._match(
+        detections[:, 0].astype(np.int64),
+        evaluator._category_index(detections[:, 1].astype(np.int64)),
+        detections[:, 2:6],
+        detections[:, 6],
+    )
+    np.testing.assert_array_equal(tp, greedy_true_positives(dataset, detections, 0.3))
+
+
+def test_detection_list_and_array_agree():
+    dataset = make_dataset([(0, 0, (10.2, 10.2, 0.8, 0.8))])
+    detection = CocoDetection(
+        image_id=0, category_id=0, bbox=(10.4, 10.4, 0.6, 0.6), score=0.9
+    )
+    array = np.array([[0, 0, 10.4, 10.4, 0.6, 0.6, 0.9]])
+
+    evaluator = CocoEvaluator(dataset)
+    assert evaluator.evaluate([detection]) == evaluator.evaluate(array)
+    assert evaluator.evaluate([detection]).per_class[0].ap == pytest.approx(1.0)
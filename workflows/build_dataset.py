@@ -0,0 +1,169 @@
+"""Flyte workflow building a coco dataset with a map task fan-out/fan-in.
+
+The query rows are partitioned by capture folder into shards, each shard is built
+into a partial dataset by a map task, and the partial datasets are merged into the
+final dataset with consistent ids.
+
+Run it locally, against stubbed S3 and database, with:
+    python workflows/build_dataset.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import zlib
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List
+
+import pandas as pd
+from dataclasses_json import dataclass_json
+from flytekit import current_context, map_task, task, workflow
+from flytekit.types.file import FlyteFile
+
+from coco_dataset import CocoDataset
+from coco_dataset.dataset.coco_dataset import CocoInfo
+from coco_dataset.dataset.dataset_builder import DfToCocoBuilder
+from coco_dataset.dataset.db_queries import DbClient
+from coco_dataset.dataset.db_queries.base_query_builder import BaseQuery
+from coco_dataset.dataset.s3_path_parser import ImageS3PathParser
+
+
+@dataclass_json
+@dataclass
+class Shard:
+    """Rows of a shard, and the parameters to resolve their images on S3.
+
+    The rows are passed as a parquet file rather than inline, as the task inputs
+    are limited in size.
+    """
+
+    rows: FlyteFile
+    frames: Dict[str, int]
+    bucket_name: str
+    bucket_region: str
+
+
+def get_db_client() -> DbClient:
+    """Database client used by the query task."""
+    return DbClient()
+
+
+def get_path_parser(
+    frames: Dict[str, int], bucket_name: str, bucket_region: str
+) -> ImageS3PathParser:
+    """S3 path parser used by the build tasks."""
+    return ImageS3PathParser(
+        frames=frames, bucket_name=bucket_name, bucket_region=bucket_region
+    )
+
+
+def _output_path(file_name: str) -> str:
+    """Path of a task output, in a new folder of the task working directory.
+
+    Map task instances can share the working directory when run locally, so each
+    output gets its own folder."""
+    folder = tempfile.mkdtemp(dir=current_context().working_directory)
+    return os.path.join(folder, file_name)
+
+
+def _write_dataset(dataset: CocoDataset, file_name: str) -> FlyteFile:
+    """Write a dataset as json in the task working directory."""
+    path = _output_path(file_name)
+    with open(path, "w") as f:
+        json.dump(dataset.dict(), f)
+    return FlyteFile(path)
+
+
+@task
+def query_rows(query: str) -> pd.DataFrame:
+    return get_db_client().run(BaseQuery(query))
+
+
+@task
+def partition_rows(
+    rows: pd.DataFrame,
+    n_shards: int,
+    frames: Dict[str, int],
+    bucket_name: str,
+    bucket_region: str,
+) -> List[Shard]:
+    """Split the rows in shards, keeping the rows of a capture folder together."""
+    if n_shards < 1:
+        raise ValueError(f"n_shards must be positive, got {n_shards}")
+
+    shard_ids = rows["CaptureFolderId"].map(
+        lambda folder: zlib.crc32(str(folder).encode()) % n_shards
+    )
+    shards: List[Shard] = []
+    for shard_id, shard_rows in rows.groupby(shard_ids):
+        path = _output_path(f"rows-{shard_id:05d}.parquet")
+        shard_rows.to_parquet(path, index=False)
+        shards.append(
+            Shard(
+                rows=FlyteFile(path),
+                frames=frames,
+                bucket_name=bucket_name,
+                bucket_region=bucket_region,
+            )
+        )
+    return shards
+
+
+@task
+def build_shard(shard: Shard) -> FlyteFile:
+    parser = get_path_parser(shard.frames, shard.bucket_name, shard.bucket_region)
+    builder = DfToCocoBuilder(
+        dataset_name="shard",
+        dataframe=pd.read_parquet(shard.rows.download()),
+        path_parser=parser,
+    )
+    return _write_dataset(builder.build(), "shard.json")
+
+
+@task
+def merge_shards(shards: List[FlyteFile], dataset_name: str) -> FlyteFile:
+    datasets = [CocoDataset.from_json(shard.download()) for shard in shards]
+    info = CocoInfo(
+        description=dataset_name,
+        date_created=str(date.today()),
+        version="1.0.0",
+    )
+    dataset = CocoDataset.merge(datasets, info=info)
+    return _write_dataset(dataset, f"{dataset_name}.json")
+
+
+@workflow
+def build_dataset_wf(
+    query: str,
+    dataset_name: str,
+    frames: Dict[str, int],
+    bucket_name: str,
+    bucket_region: str,
+    n_shards: int = 4,
+) -> FlyteFile:
+    rows = query_rows(query=query)
+    shards = partition_rows(
+        rows=rows,
+        n_shards=n_shards,
+        frames=frames,
+        bucket_name=bucket_name,
+        bucket_region=bucket_region,
+    )
+    partial_datasets = map_task(build_shard)(shard=shards)
+    return merge_shards(shards=partial_datasets, dataset_name=dataset_name)
+
+
+if __name__ == "__main__":
+    from local_stubs import stubbed_clients
+
+    with stubbed_clients(sys.modules[__name__]) as query:
+        output = build_dataset_wf(
+            query=query,
+            dataset_name="local",
+            frames={"cam_0": 0, "cam_1": 1},
+            bucket_name="bucket",
+            bucket_region="eu-west-2",
+        )
+    print(f"Running build_dataset_wf() {output}")
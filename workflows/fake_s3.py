@@ -0,0 +1,82 @@
+"""In-process stand-ins of the boto3 S3 resource, to run code without AWS."""
+
+import bisect
+import hashlib
+import io
+from typing import Dict, Iterator, List, Optional
+
+
+class FakeS3Object:
+    """Stand-in of the boto3 `Object` and `ObjectSummary` of a key."""
+
+    def __init__(self, bucket_name: str, key: str, body: bytes) -> None:
+        self.bucket_name = bucket_name
+        self.key = key
+        self.body = body
+        self.size = len(body)
+        self.e_tag = f'"{hashlib.md5(body).hexdigest()}"'
+
+    def get(self, Range: Optional[str] = None) -> Dict[str, io.BytesIO]:
+        body = self.body
+        if Range:
+            start, end = Range.replace("bytes=", "").split("-")
+            body = body[int(start) : int(end) + 1]
+        return {"Body": io.BytesIO(body)}
+
+    def download_file(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self.body)
+
+
+class FakeS3Objects:
+    def __init__(self, bucket: "FakeS3Bucket") -> None:
+        self._bucket = bucket
+
+    def filter(self, Prefix: str = "") -> Iterator[FakeS3Object]:
+        keys = self._bucket.sorted_keys()
+        for i in range(bisect.bisect_left(keys, Prefix), len(keys)):
+            if not keys[i].startswith(Prefix):
+                break
+            yield self._bucket.contents[keys[i]]
+
+    def all(self) -> Iterator[FakeS3Object]:
+        return self.filter()
+
+
+class FakeS3Bucket:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.contents: Dict[str, FakeS3Object] = {}
+        self.objects = FakeS3Objects(self)
+        self._sorted_keys: Optional[List[str]] = None
+
+    def put_object(self, Key: str, Body: bytes = b"") -> FakeS3Object:
+        self.contents[Key] = FakeS3Object(self.name, Key, Body)
+        self._sorted_keys = None
+        return self.contents[Key]
+
+    def sorted_keys(self) -> List[str]:
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self.contents)
+        return self._sorted_keys
+
+
+class FakeS3Resource:
+    """Stand-in of a boto3 S3 resource, holding its objects in memory.
+
+    Use like:
+    >>> s3 = FakeS3Resource()
+    >>> s3.Bucket("bucket").put_object(Key="folder/cam/0000.JPG", Body=b"...")
+    >>> parser = ImageS3PathParser(frames, "bucket", "eu-west-2", s3_resource=s3)
+    """
+
+    def __init__(self) -> None:
+        self._buckets: Dict[str, FakeS3Bucket] = {}
+
+    def Bucket(self, name: str) -> FakeS3Bucket:
+        if name not in self._buckets:
+            self._buckets[name] = FakeS3Bucket(name)
+        return self._buckets[name]
+
+    def Object(self, bucket_name: str, key: str) -> FakeS3Object:
+        return self.Bucket(bucket_name).contents[key]
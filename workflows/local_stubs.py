@@ -0,0 +1,67 @@
+"""In-memory S3 and database stand-ins to run workflows locally."""
+
+import sqlite3
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Iterator
+from unittest import mock
+
+from coco_dataset.dataset.db_queries import DbClient
+from coco_dataset.dataset.s3_path_parser import ImageS3PathParser
+from fake_s3 import FakeS3Resource
+
+ROWS = [
+    ("eu-west-2", "bucket", f"folder_{i}", f"class_{i % 3}", "2023-10-01")
+    for i in range(20)
+]
+CAMERAS = ["cam_0", "cam_1"]
+FRAMES_PER_CAMERA = 3
+
+
+def stub_db_connection() -> sqlite3.Connection:
+    """In-memory database holding the `ROWS` in a `Labels` table."""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE Labels (BucketRegion TEXT, S3Bucket TEXT, "
+        "CaptureFolderId TEXT, SpecificationClass TEXT, CaptureDate TEXT)"
+    )
+    conn.executemany("INSERT INTO Labels VALUES (?, ?, ?, ?, ?)", ROWS)
+    return conn
+
+
+def stub_s3_resource() -> FakeS3Resource:
+    """S3 resource holding `FRAMES_PER_CAMERA` frames per camera of each row."""
+    s3 = FakeS3Resource()
+    bucket = s3.Bucket("bucket")
+    for _, _, folder, _, _ in ROWS:
+        for camera in CAMERAS:
+            for frame in range(FRAMES_PER_CAMERA):
+                bucket.put_object(Key=f"{folder}/{camera}/{frame:04d}.JPG")
+    return s3
+
+
+@contextmanager
+def stubbed_clients(workflow_module: ModuleType) -> Iterator[str]:
+    """Patch the client factories of a workflow module with the stubs.
+
+    Yields:
+        str: query selecting the stubbed rows.
+    """
+    conn = stub_db_connection()
+    s3 = stub_s3_resource()
+
+    def get_path_parser(frames, bucket_name, bucket_region) -> ImageS3PathParser:
+        return ImageS3PathParser(
+            frames=frames,
+            bucket_name=bucket_name,
+            bucket_region=bucket_region,
+            s3_resource=s3,
+        )
+
+    try:
+        with mock.patch.object(
+            workflow_module, "get_db_client", lambda: DbClient(db_conn=conn)
+        ), mock.patch.object(workflow_module, "get_path_parser", get_path_parser):
+            yield "SELECT * FROM Labels"
+    finally:
+        conn.close()